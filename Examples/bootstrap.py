@@ -5,14 +5,10 @@ sys.path.append('../')
 
 import veripy as v
 
-NSHM = v.Probabilistic()
-
 # Load in National Seismic Hazard Map data
-file = open('NSHM-21.dat')
-for line in file.readlines():
-    f,o = line.split()[2:4]
-    NSHM.add_data(float(f),int(o))
-file.close()
+F,O = v.tools.read_table('NSHM-21.dat', [2,3])
+
+NSHM = v.Probabilistic.from_arrays(F,O)
 
 NSHM.bootstrap(100)
 
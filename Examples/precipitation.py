@@ -8,25 +8,14 @@ import veripy as v
 # Data was snagged from
 # http://www.bom.gov.au/bmrc/wefor/staff/eee/verif/POP3/POP3.html
 
-forecast24 = v.Probabilistic()
-forecast48 = v.Probabilistic()
-
-# Open the data file
-file = open('POP_3cat_2003.txt')
-
-# Gobble the header line
-file.readline()
-
-# Parse the data
-for line in file.readlines():
-    a,b,c,d,e,f,g,h,i,j = line.split()
-    try:    forecast24.add_data( float(f)+float(g) , int(float(d)>0) )
-    except: pass
-    try:    forecast48.add_data( float(i)+float(j) , int(float(d)>0) )
-    except: pass
-# Close the data file
-
-file.close()
+# Load the data, skipping missing (-999) forecasts
+F,O = v.tools.read_table('POP_3cat_2003.txt',
+                         ['p24_cat1 + p24_cat2', 'obs > 0'], missing=-999)
+forecast24 = v.Probabilistic.from_arrays(F,O)
+
+F,O = v.tools.read_table('POP_3cat_2003.txt',
+                         ['p48_cat1 + p48_cat2', 'obs > 0'], missing=-999)
+forecast48 = v.Probabilistic.from_arrays(F,O)
 
 # Make some plots
 labels = ( '24-hour Forecasts' , '48-hour Forecasts' )
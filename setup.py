@@ -21,7 +21,8 @@ setup(name='VeriPy',
       author_email='jrholliday@gmail.com',
       url='https://github.com/jrholliday/VeriPy',
       license='MAME',
-      packages=['veripy', 'veripy.tools'],
-      package_data={'veripy': ['license.txt']},
+      packages=['veripy', 'veripy.tools', 'veripy.bench'],
+      package_data={'veripy': ['license.txt'],
+                    'veripy.bench': ['golden.json']},
       )
 
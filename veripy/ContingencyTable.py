@@ -17,6 +17,8 @@ from __future__ import division
 
 from MultiContingencyTable import MultiContingencyTable
 
+import warnings
+
 import numpy
 import scipy.special
 
@@ -32,6 +34,9 @@ class ContingencyTable(MultiContingencyTable):
 
     Data is organized and entered by listing:
         n(F=yes, O=yes), n(F=yes, O=no), n(F=no, O=yes), n(F=no, O=no)
+
+    Tables can also be counted from boolean yes/no arrays:
+        table = ContingencyTable.from_categories(F > 0.5, O > 0)
     """
 
     #-------------------------------------------------------------------------#
@@ -65,6 +70,45 @@ class ContingencyTable(MultiContingencyTable):
 
     #-------------------------------------------------------------------------#
 
+    @classmethod
+    def from_categories(cls, forecast, observed):
+        """Create a table from arrays of forecast/observed categories.
+
+        Keyword arguments:
+        forecast -- array of forecasts, either boolean or categories.
+        observed -- array of observations, either boolean or categories.
+
+        Boolean arrays are read as yes (True) or no (False).  Integer
+        categories are 0 for yes and 1 for no.
+
+        Return value:
+        new ContingencyTable object.
+        """
+
+        # End from_categories(cls, ...)
+        return super(ContingencyTable, cls).from_categories(forecast,
+                                                            observed, 2)
+
+    #-------------------------------------------------------------------------#
+
+    @staticmethod
+    def _tabulate(forecast, observed, k):
+        """Count forecast/observed yes/no pairs into a 2x2 table.
+
+        This is an internal function and should not be called directly.
+        Boolean arrays are turned into categories, yes first.
+        """
+        F = numpy.asarray(forecast)
+        O = numpy.asarray(observed)
+
+        if F.dtype == bool: F = ~F
+        if O.dtype == bool: O = ~O
+
+        # End _tabulate(...)
+        return MultiContingencyTable._tabulate(F, O, k)
+
+    #-------------------------------------------------------------------------#
+
     def _calc_stats(self):
         """Calculate statistics on table data.
 
@@ -179,4 +223,165 @@ class ContingencyTable(MultiContingencyTable):
         # End _calc_stats(self)
         return None
 
+    #-------------------------------------------------------------------------#
+
+    @staticmethod
+    def batch_stats(data):
+        """Calculate statistics on a stack of 2x2 tables at once.
+
+        Keyword arguments:
+        data -- (M,4) or (M,2,2) array of table data.
+
+        Each row of data is entered as for set_data():
+        n(F=yes, O=yes), n(F=yes, O=no), n(F=no, O=yes), n(F=no, O=no)
+
+        A (M,2,2) array is laid out as for
+        MultiContingencyTable.batch_stats, with entry [m,i,j] equal
+        to n(Fi,Oj) of table m (category 0 being "yes"), and is read
+        as the (M,4) array of the same entries.
+
+        The scores are computed with array arithmetic over all rows.
+        Where the single-table code catches a division by zero, the
+        score is 0.  EDS, D and Az follow NumPy nan/inf rules, as they
+        do for a single table.  Rows with no entries, for which the
+        single-table code raises, give NaN for every score.
+
+        Return value:
+        dictionary of (M,) arrays of test results indexed by test.
+        """
+        data = numpy.asarray(data, dtype=numpy.int64)
+
+        # Accept 2x2 matrices, as MultiContingencyTable does
+        if data.ndim >= 2 and data.shape[-2:] == (2, 2):
+            data = data.reshape(data.shape[:-2] + (4,))
+
+        if data.shape[-1] != 4:
+            raise Exception("Table data not 2x2 matrix (N=%d)"
+                            % data.shape[-1])
+
+        A = data[...,0]
+        B = data[...,1]
+        C = data[...,2]
+        D = data[...,3]
+
+        N = A + B + C + D
+
+        stats = {}
+
+        def ratio(num, den):
+            # Division that gives 0, like the single-table try/except
+            with numpy.errstate(divide='ignore', invalid='ignore'):
+                res = num / den
+            return numpy.where(den == 0, 0.0, res)
+
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            # Calculate the "Base Rate"
+            BR = ( A + C ) / N
+            stats['BR'] = BR
+
+            # Calculate the "Probability of a Forcast of Occurence"
+            stats['PFO'] = ( A + B ) / N
+
+            # Calculate the "Percent Correct" ("accuracy")
+            stats['PC'] = ( A + D ) / N
+
+        # Calculate the "Bias Score" ("frequency bias")
+        stats['BIAS'] = ratio( A + B , A + C )
+
+        # Calculate the "Probability of Detection" ("hit rate")
+        POD = ratio( A , A + C )
+        stats['POD'] = POD
+
+        # Calculate the "False Alarm Ratio"
+        stats['FAR'] = ratio( B , A + B )
+
+        # Calculate the "Probability of False Detection"
+        # ("false alarm rate")
+        POFD = ratio( B , B + D )
+        stats['POFD'] = POFD
+
+        # Calculate the "Threat Score" ("critical success index")
+        stats['TS'] = ratio( A , A + B + C )
+
+        # Calculate the "Equitable Threat Score" ("Gilbert
+        # skill score")
+        HR = ratio( ( A + C ) * ( A + B ) , N )
+        stats['ETS'] = ratio( A - HR , A + B + C - HR )
+
+        # Calculate the "Peirces's Skill Score" ("Hanssen and
+        # Kuipers dicriminant" or "true skill statistic")
+        stats['PSS'] = POD - POFD
+
+        # Calculate the "Heidke Skill Score"
+        ECR = ratio( (A+C)*(A+B) + (C+D)*(B+D) , N )
+        stats['HSS'] = ratio( (A+D)-ECR , N-ECR )
+
+        # Calculate the "Odds Ratio"
+        stats['OR'] = ratio( ratio( POD , 1 - POD ) ,
+                             ratio( POFD , 1 - POFD ) )
+
+        # Calculate the "Odds Ratio Skill Score" (Yule's "Q")
+        stats['ORSS'] = ratio( A*D - C*B , A*D + C*B )
+
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            # Calculate the "Extreme Dependency Score"
+            stats['EDS'] = ( 2 * numpy.log(BR) / numpy.log(BR * POD) ) - 1.0
+
+            # Calculate the "Discrimination Distance"
+            Dist = numpy.sqrt(2) * (scipy.special.erfinv(1-2*POFD) -
+                                    scipy.special.erfinv(1-2*POD))
+            stats['D'] = Dist
+
+            # Calculate the "Area Under the Modelled ROC"
+            stats['Az'] = 0.5 + 0.5*scipy.special.erf(0.5*Dist)
+
+        # Empty tables have no scores
+        for test in stats:
+            stats[test] = numpy.where(N == 0, numpy.nan, stats[test])
+
+        # End batch_stats(...)
+        return stats
+
+    #-------------------------------------------------------------------------#
+
+    def confidence(self, n=10000, sigma=1.96, seed=None):
+        """Estimate confidence intervals for the table statistics.
+
+        Keyword arguments:
+        n     -- number of bootstrap tables. (default 10000)
+        sigma -- sigma level for confidence intervals. (default 1.96)
+        seed  -- seed value for random number generator. (default None)
+
+        Bootstrap tables are drawn all at once from the multinomial
+        distribution given by the table cell frequencies, with the same
+        total count, and scored together with batch_stats.  The bounds
+        of each statistic are percentiles of its bootstrap values, with
+        undefined (NaN) values left out.
+
+        Return value:
+        dictionary of (lower,upper) bounds indexed by test.
+        """
+        N = self._data.sum()
+
+        rng = numpy.random.RandomState(seed)
+        tables = rng.multinomial(N, self._data.ravel() / N, size=n)
+
+        stats = self.batch_stats(tables)
+
+        siglevel = scipy.special.erf(sigma/numpy.sqrt(2))
+        levels = [ 50*(1-siglevel) , 50*(1+siglevel) ]
+
+        results = {}
+
+        # Statistics undefined for every table give NaN bounds
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+
+            for test in stats:
+                bounds = numpy.nanpercentile(stats[test], levels)
+                results[test] = tuple(bounds.tolist())
+
+        # End confidence(self, ...)
+        return results
+
 ###############################################################################
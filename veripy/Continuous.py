@@ -15,7 +15,11 @@ definition.  This class inherits from the Forecasts base class.
 
 from __future__ import division
 
+from collections import OrderedDict
+
 from Forecast import Forecast
+from tools.DataBuffer import DataBuffer
+from tools.Accumulators import ContinuousAccumulator
 
 import numpy
 
@@ -30,14 +34,32 @@ class Continuous(Forecast):
 
     #-------------------------------------------------------------------------#
 
-    def __init__(self):
-        """Initialize Continuous object."""
+    def __init__(self, dtype=(float, float), streaming=False):
+        """Initialize Continuous object.
+
+        Keyword arguments:
+        dtype     -- (forecast, observed) storage data types.
+                     (default (float, float))
+        streaming -- keep running sums instead of the data pairs?
+                     (default False)
+
+        In streaming mode the data pairs are not stored.  Statistics
+        come from a ContinuousAccumulator that is updated in O(1) per
+        pair, and streaming objects can be merged.  The scatter and
+        histogram methods need the data pairs and are not available.
+        """
 
-        # Storage for data vectors ( forecast , observed )
-        self._data = []
+        # Storage for data columns ( forecast , observed )
+        self._data = DataBuffer(dtype)
 
         # Storage for calculated statistics
         self._stats = {}
+
+        # Storage for memoized results
+        self._cache = OrderedDict()
+
+        # Running sums for streaming mode
+        self._acc = ContinuousAccumulator() if streaming else None
   
     #-------------------------------------------------------------------------#
 
@@ -52,26 +74,130 @@ class Continuous(Forecast):
         None
         """
 
-        # Add data to the table list
-        self._data.append( (forecast , observed) )
+        # Add data to the data columns (or the running sums)
+        if self._acc is not None:
+            self._acc.update(forecast, observed)
+        else:
+            self._data.append(forecast, observed)
 
         # Reset the statistics object
         self._stats = {}
 
+        # Reset the memoized results
+        self._cache.clear()
+
         # End add_data(self, ...)
         return None
 
     #-------------------------------------------------------------------------#
 
+    def add_data_array(self, forecast, observed):
+        """Add arrays of forecast/observed data pairs.
+
+        Keyword arguments:
+        forecast -- array of forecasted values.
+        observed -- array of actual observed values.
+
+        Return value:
+        None
+        """
+
+        # Add data to the data columns (or the running sums)
+        if self._acc is not None:
+            self._acc.update_array(forecast, observed)
+        else:
+            self._data.extend(forecast, observed)
+
+        # Reset the statistics object
+        self._stats = {}
+
+        # Reset the memoized results
+        self._cache.clear()
+
+        # End add_data_array(self, ...)
+        return None
+
+    #-------------------------------------------------------------------------#
+
+    def merge(self, other):
+        """Add the data of another Continuous object.
+
+        Keyword arguments:
+        other -- Continuous object to merge in.
+
+        The data pairs (or running sums) of other are combined with
+        our own.  Partial results from different shards or processes
+        can be merged exactly.
+
+        Return value:
+        None
+        """
+
+        if self._acc is not None and other._acc is not None:
+            self._acc.merge(other._acc)
+
+        elif other._acc is not None:
+            raise Exception("Cannot merge a streaming object into a "
+                            "non-streaming object.")
+
+        elif self._acc is not None:
+            self._acc.update_array(other._data.F, other._data.O)
+
+        else:
+            self._data.extend(other._data.F, other._data.O)
+
+        # Reset the statistics object
+        self._stats = {}
+
+        # Reset the memoized results
+        self._cache.clear()
+
+        # End merge(self, ...)
+        return None
+
+    #-------------------------------------------------------------------------#
+
+    @classmethod
+    def from_arrays(cls, forecast, observed, dtype=(float, float),
+                    streaming=False):
+        """Create a Continuous object from forecast/observed arrays.
+
+        Keyword arguments:
+        forecast  -- array of forecasted values.
+        observed  -- array of actual observed values.
+        dtype     -- (forecast, observed) storage data types.
+                     (default (float, float))
+        streaming -- keep running sums instead of the data pairs?
+                     (default False)
+
+        Return value:
+        new Continuous object.
+        """
+        data = cls(dtype, streaming)
+        data.add_data_array(forecast, observed)
+
+        # End from_arrays(cls, ...)
+        return data
+
+    #-------------------------------------------------------------------------#
+
     def _calc_stats(self):
         """Calculate statistics on forecasted and observed data sets.
 
         This is an internal function and should not be called directly.
         """
+
+        # Streaming mode reads everything from the running sums
+        if self._acc is not None:
+            self._stats = self._acc.stats()
+
+            # End _calc_stats(self)
+            return None
+
         N = len(self._data)
 
-        # Separate the Forecast from the observations
-        F,O = [ numpy.array(col) for col in map(None, *self._data) ]
+        # Get views of the Forecast and the observations
+        F,O = self._data.F, self._data.O
 
         # Calculate array totals
         sumF = F.sum()
@@ -136,8 +262,10 @@ class Continuous(Forecast):
         tuple of y values.
         """
 
-        # Separate the Forecast from the observations
-        F,O = [ numpy.array(col) for col in map(None, *self._data) ]
+        self._check_pairs('Scatter')
+
+        # Get views of the Forecast and the observations
+        F,O = self._data.F, self._data.O
 
         try:
             X,Y = { # Type = 0 : X=Observed, Y=Forecast
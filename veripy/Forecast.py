@@ -16,6 +16,11 @@ Forecast.  The Forecast type should not be used by itself.
 
 from __future__ import division
 
+from collections import OrderedDict
+
+from tools.DataBuffer import DataBuffer
+from tools.Binning import bin_edges, bin_index
+
 import numpy
 
 ###############################################################################
@@ -26,21 +31,45 @@ class Forecast(object):
     The Continuous class and the Probabilisitic class both inherit
     from this base class.  This class should not be called or used by
     itself.
+
+    Curve, histogram and reliability results are memoized, keyed by
+    method and arguments.  Up to _cache_size results are kept, and the
+    least recently used result is dropped first.  Adding data (or
+    bootstrapping) clears the cache.
+
+    In streaming mode, a subclass keeps running sums in _acc instead
+    of the data pairs, and methods that need the pairs raise.  In
+    chunked mode, _data is a read-only tools.MemmapData object and
+    the data is worked through one chunk at a time.
     """
 
+    # Maximum number of memoized results
+    _cache_size = 16
+
+    # Running sums for streaming mode (None if the pairs are stored)
+    _acc = None
+
+    # Is the data memory-mapped and read in chunks?
+    _chunked = False
+
     #-------------------------------------------------------------------------#
 
-    def __init__(self):
-        """Initialize Forecast object."""
+    def __init__(self, dtype=(float, float)):
+        """Initialize Forecast object.
 
-        # Storage for data array
-        self._data = []
+        Keyword arguments:
+        dtype -- (forecast, observed) storage data types.
+                 (default (float, float))
+        """
+
+        # Storage for data columns ( forecast , observed )
+        self._data = DataBuffer(dtype)
 
         # Storage for calculated statistics
         self._stats = {}
 
-         # Storage for histogram thresholds
-        self._hist = {}
+        # Storage for memoized results
+        self._cache = OrderedDict()
 
     #-------------------------------------------------------------------------#
 
@@ -60,6 +89,56 @@ class Forecast(object):
 
     #-------------------------------------------------------------------------#
 
+    def _cached(self, function, *args):
+        """Return a memoized result of function(*args).
+
+        This is an internal function and should not be called directly.
+
+        Lists (and arrays) among the arguments are turned into tuples
+        to build the cache key.  Each argument is keyed along with its
+        type, since equal values of different types (such as True and
+        1) can select different code paths.  Results must not be
+        changed in place by the caller.
+        """
+        key = [function.__name__]
+        for arg in args:
+            if isinstance(arg, (list, numpy.ndarray)):
+                arg = tuple(numpy.asarray(arg).tolist())
+            key.append( (type(arg), arg) )
+        key = tuple(key)
+
+        try:
+            # Move the hit to the most recently used end
+            result = self._cache.pop(key)
+
+        except KeyError:
+            result = function(*args)
+
+            # Drop the least recently used results
+            while len(self._cache) >= self._cache_size:
+                self._cache.popitem(last=False)
+
+        self._cache[key] = result
+
+        # End _cached(self, ...)
+        return result
+
+    #-------------------------------------------------------------------------#
+
+    def _check_pairs(self, method):
+        """Raise if the data pairs are not kept (streaming mode).
+
+        This is an internal function and should not be called directly.
+        """
+        if self._acc is not None:
+            raise Exception("%s needs the data pairs, which are not kept "
+                            "in streaming mode." % method)
+
+        # End _check_pairs(self, ...)
+        return None
+
+    #-------------------------------------------------------------------------#
+
     def _calc_stats(self):
         """Calculate statistics on forecasted and observed data sets.
 
@@ -132,12 +211,14 @@ class Forecast(object):
 
     #-------------------------------------------------------------------------#
 
-    def histogram(self, bins, unit=None):
+    def histogram(self, bins, unit=None, asarray=False):
         """Return the summed observations in forecasted categories.
 
         Keyword arguments:
-        bins -- number or description of bins to populate.
-        unit -- construct bins uniformly over the total range? (default None)
+        bins    -- number or description of bins to populate.
+        unit    -- construct bins uniformly over the total range?
+                   (default None)
+        asarray -- return arrays instead of a dictionary? (default False)
 
         The bins keyword can either be an integer, N, of bins to
         populate or a list of upper edges.  If a set number is passed
@@ -149,89 +230,76 @@ class Forecast(object):
 
         Return value:
         dictionary of observations and sample sizes indexed by upper
-        bin threshold.
+        bin threshold.  If asarray is True, instead return a tuple of
+        the bin edges, the summed observations and the sample sizes.
+        The last two arrays hold the underflow first, then one entry
+        per bin, then the overflow.
         """
+        self._check_pairs('Histogram')
+
+        edges,sums,count = self._cached(self._calc_histogram, bins, unit)
 
+        if asarray:
+            return edges.copy(), sums.copy(), count.copy()
+
+        sums  = sums.tolist()
+        count = count.tolist()
+
+        # Inititialize the histogram object
         hist = {}
 
-        # Separate the Forecast from the observations
-        F,O = [ numpy.array(col) for col in map(None, *self._data) ]
+        hist['under'] = [sums[0],count[0]]
+        hist['over']  = [sums[-1],count[-1]]
+
+        for i in xrange(1,len(edges)):
+            hist.setdefault(.5*(edges[i-1]+edges[i]), [0,0])
+
+        for i in xrange(1,len(edges)):
+            hist[.5*(edges[i-1]+edges[i])][0] += sums[i]
+            hist[.5*(edges[i-1]+edges[i])][1] += count[i]
+
+        # End histogram(self, ...)
+        return hist
+    
+    #-------------------------------------------------------------------------#
+
+    def _calc_histogram(self, bins, unit):
+        """Calculate the summed observations in forecasted categories.
+
+        This is an internal function and should not be called directly.
+        Instead, call the histogram wrapper function.
+
+        Return value:
+        array of bin edges,
+        array of summed observations (underflow, bins, overflow),
+        array of sample sizes (underflow, bins, overflow).
+        """
 
         # If number of bins is given, create the bins array
         if type(bins) is int:
-            N = bins
-            bins = []
-
-
-            if unit is None:
-                thresh = []
-                for f,o in self._data:
-                    if o >= 1:
-                        if f not in thresh:
-                            thresh.append(f)
-                    
-                thresh.sort()
-                Nobs = len(thresh)
-
-                groups = [int(Nobs/N)+1 if i<Nobs%N
-                          else int(Nobs/N)
-                          for i in range(N)]
-
-                bins.append( F.min() )
-                indx = 0
-                for i in xrange(N-1):
-                    indx += groups[i]
-                    try:
-                        bins.append(.5*(thresh[indx]+thresh[indx+1]))
-                    except:
-                        pass
-                bins.append( F.max() )
-
-            elif unit is True:
-                L = F.min()
-                U = F.max()
-
-                dx = ( U - L ) / N
-
-                for i in xrange(0 , N+1):
-                    bins.append(L + i*dx)
-
+            if self._chunked:
+                bins = self._data.bin_edges(bins, unit)
             else:
-                tmp = sorted(F)
-                NN = len(tmp)-1
+                bins = bin_edges(self._data.F, self._data.O, bins, unit)
 
-                for i in xrange(0 , N+1):
-                    bins.append(tmp[int(NN*i/N)])
+        Nbins = len(bins) + 2
+        sums  = numpy.zeros(Nbins)
+        count = numpy.zeros(Nbins, dtype=int)
 
-        # Inititialize the histogram object
-        hist['under'] = [0,0]
-        hist['over']  = [0,0]
-
-        for i in xrange(1,len(bins)):
-            hist[.5*(bins[i-1]+bins[i])] = [0,0]
+        # Sort the forecasts into bins and cumulate the observations
+        for F,O in self._data.chunks():
+            index = bin_index(bins, F)
 
-        # Loop over forecasts and cumulate the observations
-        for f,o in self._data:
+            sums  += numpy.bincount(index, weights=O, minlength=Nbins)
+            count += numpy.bincount(index, minlength=Nbins)
 
-            # Check for underflow
-            if f < bins[0]:
-                hist['under'][0] += o
-                hist['under'][1] += 1
+        sums  = sums[:-1]
+        count = count[:-1]
 
-            # Check for overflow
-            elif f > bins[-1]:
-                hist['over'][0] += o
-                hist['over'][1] += 1
+        if self._data.O.dtype.kind in 'biu':
+            sums = sums.astype(int)
 
-            # Increment the proper bin
-            else:
-                for i in xrange(1,len(bins)):
-                    if f <= bins[i]:
-                        hist[.5*(bins[i-1]+bins[i])][0] += o
-                        hist[.5*(bins[i-1]+bins[i])][1] += 1
-                        break
+        # End _calc_histogram(self, ...)
+        return numpy.array(bins), sums, count
 
-        # End histogram(self, ...)
-        return hist
-    
 ###############################################################################
@@ -26,6 +26,11 @@ class MultiContingencyTable(object):
     table for classifying multi-category forecasts.  Data is organized
     and entered by listing:
         n(F1,O1), n(F1,02), n(F1,03), ... n(F1,Ok), n(F2,O1), ... n(Fk,Ok)
+
+    Tables can also be counted from arrays of forecast and observed
+    categories (numbered 0 to k-1), and added to chunk by chunk:
+        table = MultiContingencyTable.from_categories(F, O, 3)
+        table.update(F2, O2)
     """
 
     #-------------------------------------------------------------------------#
@@ -68,19 +73,19 @@ class MultiContingencyTable(object):
         F = self._data.sum(axis=1)
         O = self._data.sum(axis=0)
 
-        # Get the max "cell size"
-        padding = len(str(self._data.max()))
+        # Append the totals to the table
+        table = numpy.zeros((self._nCat+1, self._nCat+1), dtype=int)
+        table[:-1,:-1] = self._data
+        table[:-1,-1]  = F
+        table[-1,:-1]  = O
+        table[-1,-1]   = N
+
+        # Build the string representation, one row format per row
+        row = self._nCat*"%5d" + " |%5d"
+        rule = "\n" + (self._nCat+1)*"-----" + "--\n"
 
-        # Build the string representation
-        rep = ""
-        for i in xrange(self._nCat):
-            for j in xrange(self._nCat):
-                rep += "%5d" % self._data[i,j]
-            rep += " |%5d\n" % F[i]
-        rep += (self._nCat+1)*"-----" + "--\n"
-        for i in xrange(self._nCat):
-            rep += "%5d" % O[i]
-        rep += " |%5d" % N
+        rep = (self._nCat*(row + "\n") % tuple(table[:-1].ravel()))[:-1]
+        rep += rule + row % tuple(table[-1])
 
         # End __str__(self)
         return str(rep)
@@ -142,53 +147,144 @@ class MultiContingencyTable(object):
 
     #-------------------------------------------------------------------------#
 
+    def update(self, forecast, observed):
+        """Add arrays of forecast/observed categories to the table.
+
+        Keyword arguments:
+        forecast -- array of forecast categories.
+        observed -- array of observed categories.
+
+        Return value:
+        None
+        """
+
+        if self._nCat == 0:
+            raise Exception("Cannot update a table with no categories.")
+
+        self._data += self._tabulate(forecast, observed, self._nCat)
+
+        # Calculate various statistics
+        self._calc_stats()
+
+        # End update(self, ...)
+        return None
+
+    #-------------------------------------------------------------------------#
+
+    @classmethod
+    def from_categories(cls, forecast, observed, k):
+        """Create a table from arrays of forecast/observed categories.
+
+        Keyword arguments:
+        forecast -- array of forecast categories, from 0 to k-1.
+        observed -- array of observed categories, from 0 to k-1.
+        k        -- number of categories.
+
+        Return value:
+        new table object.
+        """
+
+        counts = cls._tabulate(forecast, observed, k)
+
+        # End from_categories(cls, ...)
+        return cls(counts.ravel())
+
+    #-------------------------------------------------------------------------#
+
+    @staticmethod
+    def _tabulate(forecast, observed, k):
+        """Count forecast/observed category pairs into a k*k table.
+
+        This is an internal function and should not be called directly.
+        Each pair is coded as f*k + o, and the codes are counted with a
+        single call to numpy.bincount.
+        """
+        F = numpy.asarray(forecast).ravel()
+        O = numpy.asarray(observed).ravel()
+
+        if len(F) != len(O):
+            raise Exception("Forecast and observed arrays differ in "
+                            "length (%d!=%d)" % (len(F), len(O)))
+
+        for cats in (F, O):
+            if len(cats) and cats.dtype.kind not in 'biu':
+                raise Exception("Categories must be integers.")
+            if len(cats) and (cats.min() < 0 or cats.max() >= k):
+                raise Exception("Categories must be from 0 to %d." % (k-1))
+
+        codes = F.astype(numpy.int64)*k + O.astype(numpy.int64)
+
+        # End _tabulate(...)
+        return numpy.bincount(codes, minlength=k*k).reshape(k, k)
+
+    #-------------------------------------------------------------------------#
+
     def _calc_stats(self):
         """Calculate statistics on table data.
 
         This is an internal function and should not be called directly.
         """
 
-        # Calculate table totals
-        N = self._data.sum()
-        F = self._data.sum(axis=1)
-        O = self._data.sum(axis=0)
-        
-        # Calculate the "Percent Correct" ("accuracy")
-        PC = 0
-        for i in xrange(self._nCat):
-            PC += (self._data[i,i] / N)
-        self._stats['PC'] = PC
-
-        # Calculate the "Peirces's Skill Score" ("Hanssen and
-        # Kuipers dicriminant" or "true skill statistic")
-        num1, num2, denom = 0,0,0
-        for i in xrange(self._nCat):
-            num1  += (self._data[i,i] / N)
-            num2  += (F[i] * O[i] / N / N )
-            denom += (O[i] * O[i] / N / N )
-        try:
-            PSS = (num1 - num2)/(1-denom)
-        except:
-            PSS = 0
-        self._stats['PSS'] = PSS
-
-        # Calculate the "Heidke Skill Score"
-        num1, num2, denom = 0,0,0
-        for i in xrange(self._nCat):
-            num1  += (self._data[i,i] / N)
-            num2  += (F[i] * O[i] / N / N )
-            denom += (F[i] * O[i] / N / N )
-        try:
-            HSS = (num1 - num2)/(1-denom)
-        except:
-            HSS = 0
-        self._stats['HSS'] = HSS
+        stats = MultiContingencyTable.batch_stats(self._data)
+
+        for test in stats:
+            self._stats[test] = stats[test][()]
 
         # End _calc_stats(self)
         return None
 
     #-------------------------------------------------------------------------#
 
+    @staticmethod
+    def batch_stats(data):
+        """Calculate statistics on a stack of k*k tables at once.
+
+        Keyword arguments:
+        data -- (M,k,k) array of table data.
+
+        Entry [m,i,j] of data is n(Fi,Oj) of table m.  The scores come
+        from the trace and the forecast/observed marginals of each
+        table, so there is no loop over tables or categories.  Where a
+        denominator is zero, the scores follow NumPy nan/inf rules.
+
+        Return value:
+        dictionary of (M,) arrays of test results indexed by test.
+        """
+        data = numpy.asarray(data, dtype=numpy.int64)
+
+        if data.ndim < 2 or data.shape[-1] != data.shape[-2]:
+            raise Exception("Table data not square matrix (shape=%s)"
+                            % (data.shape,))
+
+        # Calculate table totals
+        N = data.sum(axis=-1).sum(axis=-1)
+        F = data.sum(axis=-1)
+        O = data.sum(axis=-2)
+
+        stats = {}
+
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            # Calculate the "Percent Correct" ("accuracy")
+            PC = numpy.trace(data, axis1=-2, axis2=-1) / N
+            stats['PC'] = PC
+
+            # Calculate the expected fraction correct by chance, and
+            # the same for a forecast with the observed marginals
+            FO = (F * O).sum(axis=-1) / N / N
+            OO = (O * O).sum(axis=-1) / N / N
+
+            # Calculate the "Peirces's Skill Score" ("Hanssen and
+            # Kuipers dicriminant" or "true skill statistic")
+            stats['PSS'] = (PC - FO) / (1 - OO)
+
+            # Calculate the "Heidke Skill Score"
+            stats['HSS'] = (PC - FO) / (1 - FO)
+
+        # End batch_stats(...)
+        return stats
+
+    #-------------------------------------------------------------------------#
+
     def stats(self, Test=None):
         """Return a copy of the calculated table statistics.
 
@@ -15,9 +15,19 @@ definition.  This class inherits from the Forecasts base class.
 
 from __future__ import division
 
+from collections import OrderedDict
+
 from Forecast import Forecast
-from tools.GenericCDF import GenericCDF
+from ContingencyTable import ContingencyTable
+from tools.DataBuffer import DataBuffer
 from tools.ConfidenceIntervals import CI
+from tools.Replicates import Replicates, LazyReplicates, draw_replicates
+from tools.Replicates import share_distribution, draw_shared
+from tools.Accumulators import BrierAccumulator
+from tools.MemmapData import MemmapData
+from tools.BandIndex import BandIndex
+
+import multiprocessing
 
 import numpy
 import scipy.special
@@ -34,11 +44,34 @@ class Probabilistic(Forecast):
 
     #-------------------------------------------------------------------------#
 
-    def __init__(self):
-        """Initialize Probabilistic object."""
+    def __init__(self, dtype=(float, int), streaming=False, bins=10):
+        """Initialize Probabilistic object.
+
+        Keyword arguments:
+        dtype     -- (forecast, observed) storage data types.
+                     (default (float, int))
+        streaming -- keep binned sums instead of the data pairs?
+                     (default False)
+        bins      -- number or description of Brier score bins.
+                     (default 10)
+
+        Statistics hold the Brier score (BS), the Brier skill score
+        (BSS) and the reliability, resolution and uncertainty terms
+        of its decomposition (REL, RES, UNC), whatever the storage
+        mode.  The decomposition sorts the forecasts into bins: N
+        bins of uniform width over [0,1], or a list of upper edges
+        (see tools.BrierAccumulator).  These bins are fixed when the
+        object is made and do not follow the bins or unit keywords of
+        histogram() and reliability().
+
+        In streaming mode the data pairs are not stored.  Statistics
+        come from the binned sums alone, and streaming objects can be
+        merged.  Histograms, curves and bootstrapping need the data
+        pairs and are not available.
+        """
 
-        # Storage for data vectors ( forecast , observed )
-        self._data = []
+        # Storage for data columns ( forecast , observed )
+        self._data = DataBuffer(dtype)
 
         # Storage for bootstrap "observations"
         self._boot = None
@@ -46,6 +79,15 @@ class Probabilistic(Forecast):
         # Storage for calculated statistics
         self._stats = {}
 
+        # Storage for memoized results
+        self._cache = OrderedDict()
+
+        # Bins of the Brier score decomposition
+        self._bins = bins
+
+        # Binned sums for streaming mode
+        self._acc = BrierAccumulator(bins) if streaming else None
+
     #-------------------------------------------------------------------------#
 
     def add_data(self, forecast, observed):
@@ -64,6 +106,9 @@ class Probabilistic(Forecast):
         None
         """
 
+        if self._chunked:
+            raise Exception("Cannot add data to a memory-mapped object.")
+
         # Check forecast is between 0 and 1
         if not 0 <= forecast <= 1:
             raise ValueError("Forecast must be between 0 and 1 (%s)."
@@ -74,8 +119,11 @@ class Probabilistic(Forecast):
             raise ValueError("Observation must be a positive integer (%s)."
                              % observed)
             
-        # Add data to the table list
-        self._data.append( (forecast , int(observed)) )
+        # Add data to the data columns (or the binned sums)
+        if self._acc is not None:
+            self._acc.update(forecast, int(observed))
+        else:
+            self._data.append(forecast, int(observed))
 
         # Reset the bootstrap object
         self._boot = None
@@ -83,20 +131,245 @@ class Probabilistic(Forecast):
         # Reset the statistics object
         self._stats = {}
 
+        # Reset the memoized results
+        self._cache.clear()
+
         # End add_data(self, ...)
         return None
 
     #-------------------------------------------------------------------------#
 
+    def add_data_array(self, forecast, observed):
+        """Add arrays of forecast/observed data pairs.
+
+        Keyword arguments:
+        forecast -- array of event probabilities.
+        observed -- array of numbers of observed events.
+
+        The arrays are checked as a whole against the same rules as
+        add_data(): forecasts must be between 0 and 1, inclusive, and
+        observations must be positive integers (including 0).  Boolean
+        observations are accepted.  If any pair fails, no data is
+        added.
+
+        Return value:
+        None
+        """
+
+        if self._chunked:
+            raise Exception("Cannot add data to a memory-mapped object.")
+
+        forecast = numpy.asarray(forecast).ravel()
+        observed = numpy.asarray(observed).ravel()
+
+        self._check_arrays(forecast, observed)
+
+        # Add data to the data columns (or the binned sums)
+        if self._acc is not None:
+            self._acc.update_array(forecast, observed)
+        else:
+            self._data.extend(forecast, observed)
+
+        # Reset the bootstrap object
+        self._boot = None
+
+        # Reset the statistics object
+        self._stats = {}
+
+        # Reset the memoized results
+        self._cache.clear()
+
+        # End add_data_array(self, ...)
+        return None
+
+    #-------------------------------------------------------------------------#
+
+    def _check_arrays(self, forecast, observed):
+        """Check arrays of forecast/observed data pairs.
+
+        This is an internal function and should not be called directly.
+        Raises ValueError for the first pair that breaks the rules of
+        add_data().
+        """
+
+        # Check forecasts are between 0 and 1 (NaN fails the check)
+        with numpy.errstate(invalid='ignore'):
+            bad = ~( (forecast >= 0) & (forecast <= 1) )
+        if bad.any():
+            raise ValueError("Forecast must be between 0 and 1 (%s)."
+                             % forecast[bad][0])
+
+        # Check observations are finite positive integers
+        if observed.dtype.kind not in 'bu':
+            with numpy.errstate(invalid='ignore'):
+                bad = ( ~numpy.isfinite(observed) | ~( observed >= 0 ) |
+                        ( observed != numpy.floor(observed) ) )
+            if bad.any():
+                raise ValueError("Observation must be a positive integer "
+                                 "(%s)." % observed[bad][0])
+
+        # End _check_arrays(self, ...)
+        return None
+
+    #-------------------------------------------------------------------------#
+
+    def merge(self, other):
+        """Add the data of another Probabilistic object.
+
+        Keyword arguments:
+        other -- Probabilistic object to merge in.
+
+        The data pairs (or binned sums) of other are combined with our
+        own.  Partial results from different shards or processes can
+        be merged exactly.  Streaming objects must use the same bins.
+
+        Return value:
+        None
+        """
+
+        if self._chunked:
+            raise Exception("Cannot add data to a memory-mapped object.")
+
+        if self._acc is not None and other._acc is not None:
+            self._acc.merge(other._acc)
+
+        elif other._acc is not None:
+            raise Exception("Cannot merge a streaming object into a "
+                            "non-streaming object.")
+
+        elif self._acc is not None:
+            for F,O in other._data.chunks():
+                self._acc.update_array(F, O)
+
+        else:
+            for F,O in other._data.chunks():
+                self._data.extend(F, O)
+
+        # Reset the bootstrap object
+        self._boot = None
+
+        # Reset the statistics object
+        self._stats = {}
+
+        # Reset the memoized results
+        self._cache.clear()
+
+        # End merge(self, ...)
+        return None
+
+    #-------------------------------------------------------------------------#
+
+    @classmethod
+    def from_arrays(cls, forecast, observed, dtype=(float, int),
+                    streaming=False, bins=10):
+        """Create a Probabilistic object from forecast/observed arrays.
+
+        Keyword arguments:
+        forecast  -- array of event probabilities.
+        observed  -- array of numbers of observed events.
+        dtype     -- (forecast, observed) storage data types.
+                     (default (float, int))
+        streaming -- keep binned sums instead of the data pairs?
+                     (default False)
+        bins      -- number or description of Brier score bins.
+                     (default 10)
+
+        Return value:
+        new Probabilistic object.
+        """
+        data = cls(dtype, streaming, bins)
+        data.add_data_array(forecast, observed)
+
+        # End from_arrays(cls, ...)
+        return data
+
+    #-------------------------------------------------------------------------#
+
+    @classmethod
+    def from_memmap(cls, filename, dtype, forecast=0, observed=1, offset=0,
+                    chunksize=1048576):
+        """Create a Probabilistic object over a binary file of records.
+
+        Keyword arguments:
+        filename  -- name of the binary file.
+        dtype     -- record data type, either a numpy structured dtype
+                     or a list of column types.
+        forecast  -- name or number of the forecast column. (default 0)
+        observed  -- name or number of the observed column. (default 1)
+        offset    -- bytes to skip at the start of the file. (default 0)
+        chunksize -- number of records per chunk. (default 1048576)
+
+        The file is mapped with numpy.memmap (see tools.MemmapData)
+        and never read into memory as a whole.  Statistics (with the
+        default Brier score bins, see __init__), histograms and
+        reliability data are summed one chunk at a time.  ROC and
+        error curves (and the ROC area) are exact: the forecasts below
+        each threshold are counted chunk by chunk with binary
+        searches.  Memory use is bounded by the chunk size, not the
+        number of records, when explicit thresholds or approx= are
+        given.  Only the exact default mode (threshold=None) gathers
+        the forecasts of the cells with events as its thresholds, and
+        so costs memory in the number of events.  Confidence bands
+        come from the binomial distribution, since the object cannot
+        be bootstrapped.  The data is checked (one chunk at a time)
+        against the rules of add_data(), and no more data can be
+        added.
+
+        For example, an NSHM-style "lon lat prob count" grid can be
+        written out with
+
+            numpy.loadtxt('grid.dat').tofile('grid.bin')
+
+        and opened with
+
+            Probabilistic.from_memmap('grid.bin', ['f8']*4,
+                                      forecast=2, observed=3)
+
+        Return value:
+        new Probabilistic object.
+        """
+        data = cls()
+
+        data._data = MemmapData(filename, dtype, forecast, observed,
+                                offset, chunksize)
+        data._chunked = True
+
+        for F,O in data._data.chunks():
+            data._check_arrays(F, O)
+
+        # End from_memmap(cls, ...)
+        return data
+
+    #-------------------------------------------------------------------------#
+
     def _calc_stats(self):
         """Calculate statistics on forecasted and observed data sets.
 
         This is an internal function and should not be called directly.
         """
+
+        # Streaming mode reads everything from the binned sums
+        if self._acc is not None:
+            self._stats = self._acc.stats()
+
+            # End _calc_stats(self)
+            return None
+
+        # Chunked mode fills the same binned sums a chunk at a time
+        if self._chunked:
+            acc = BrierAccumulator(self._bins)
+            for F,O in self._data.chunks():
+                acc.update_array(F, O)
+
+            self._stats = acc.stats()
+
+            # End _calc_stats(self)
+            return None
+
         N = len(self._data)
 
-        # Separate the Forecast from the observations
-        F,O = [ numpy.array(col) for col in map(None, *self._data) ]
+        # Get views of the Forecast and the observations
+        F,O = self._data.F, self._data.O
 
         # Calculate the climatology value
         C = O.mean()
@@ -110,6 +383,15 @@ class Probabilistic(Forecast):
         BSS = 1 - BS/BSC
         self._stats['BSS'] = BSS
 
+        # Calculate the "Reliability", "Resolution" and "Uncertainty"
+        # from the same binned sums as the other storage modes
+        acc = BrierAccumulator(self._bins)
+        acc.update_array(F, O)
+
+        for key, value in acc.stats().items():
+            if key not in ('BS', 'BSS'):
+                self._stats[key] = value
+
         # Calculate the "Ranked Probability Score"
         pass
 
@@ -142,6 +424,19 @@ class Probabilistic(Forecast):
         tuple of sample sizes in each bin,
         climatology measure.
         """
+        self._check_pairs('Reliability')
+
+        # End reliability(self, ...)
+        return self._cached(self._calc_reliability, bins, unit)
+
+    #-------------------------------------------------------------------------#
+
+    def _calc_reliability(self, bins, unit):
+        """Calculate reliability data and climatology background.
+
+        This is an internal function and should not be called directly.
+        Instead, call the reliability wrapper function.
+        """
 
         # Histogram the data
         hist = self.histogram(bins,unit)
@@ -158,14 +453,15 @@ class Probabilistic(Forecast):
                 z.append(hist[key][1])
 
         # Determine the climatology background
-        climatology = sum(map(None,*self._data)[1]) / len(self._data)
+        climatology = sum( O.sum() for F,O in self._data.chunks() ) / \
+                      len(self._data)
 
-        # End reliability(self, ...)
+        # End _calc_reliability(self, ...)
         return tuple(x), tuple(y), tuple(z), climatology
 
     #-------------------------------------------------------------------------#
 
-    def roc(self, threshold=None, unit=True, sigma=1.96):
+    def roc(self, threshold=None, unit=True, sigma=1.96, approx=None):
         """Calculate and return relative operating characteristic (ROC) data.
 
         Keyword arguments:
@@ -173,6 +469,8 @@ class Probabilistic(Forecast):
                      alarm rates. (default None)
         unit  -- construct bins uniformly over the total range? (default True)
         sigma -- sigma level for confidence bands. (default 1.96)
+        approx -- number of forecast buckets for an approximate curve.
+                  (default None)
 
         The threshold keyword can either be an integer, N, of
         probability thresholds to use or a list of specific
@@ -183,17 +481,33 @@ class Probabilistic(Forecast):
         estimated using the binomial distribution if the bootstrap
         function has not been previously called.
 
+        If approx is set to an integer, K, the forecasts are first
+        quantized into K buckets and the curve is built from the
+        bucket counts in O(N + K), with one point per bucket.  The
+        threshold keyword is then ignored.  The buckets have uniform
+        width over the forecast range (unit=True) or hold roughly the
+        same number of cells (unit=False).  Within a bucket the exact
+        curve is replaced by a straight line, so the area under the
+        approximate ROC curve differs from the area of the exact
+        curve through every distinct forecast value (the area
+        returned by auc) by at most 0.5*sum(n1*n0)/(N1*N0), where n1
+        and n0 are the numbers of cells with and without events in
+        each bucket and N1 and N0 are their totals (see approx_bound).
+
         Return values:
         tuple of x values,
         tuple of y values,
         tuple of (lower,upper) x-axis confidence bands,
         tuple of (lower,upper) y-axis confidence bands.
         """
-        return self._calc_curve('ROC', threshold, unit, sigma)
+        self._check_pairs('ROC')
+
+        return self._cached(self._calc_curve, 'ROC', threshold, unit, sigma,
+                            approx)
 
     #-------------------------------------------------------------------------#
 
-    def error(self, threshold=None, unit=True, sigma=1.96):
+    def error(self, threshold=None, unit=True, sigma=1.96, approx=None):
         """Calculate and return error diagram data.
 
         Keyword arguments:
@@ -201,6 +515,8 @@ class Probabilistic(Forecast):
                      fraction of alarm space. (default None)
         unit  -- construct bins uniformly over the total range? (default True)
         sigma -- sigma level for confidence bands. (default 1.96)
+        approx -- number of forecast buckets for an approximate curve.
+                  (default None)
 
         The threshold keyword can either be an integer, N, of
         probability thresholds to use or a list of specific
@@ -211,17 +527,28 @@ class Probabilistic(Forecast):
         estimated using the binomial distribution if the bootstrap
         function has not been previously called.
 
+        If approx is set to an integer, K, the curve is built from K
+        forecast buckets, as for roc().  The area above the
+        approximate error diagram differs from the area of the exact
+        diagram through every distinct forecast value by at most
+        0.5*sum(n*n1)/(N*N1), where n and n1 are the numbers of
+        cells and of cells with events in each bucket and N and N1
+        are their totals (see approx_bound).
+
         Return values:
         tuple of x values,
         tuple of y values,
         tuple of (lower,upper) x-axis confidence bands,
         tuple of (lower,upper) y-axis confidence bands.
         """
-        return self._calc_curve('ERROR', threshold, unit, sigma)
+        self._check_pairs('Error')
+
+        return self._cached(self._calc_curve, 'ERROR', threshold, unit,
+                            sigma, approx)
 
     #-------------------------------------------------------------------------#
 
-    def _calc_curve(self, curve, threshold, unit, sigma):
+    def _calc_curve(self, curve, threshold, unit, sigma, approx=None):
         """Calculate and return assorted (ROC, error, etc) diagram data.
 
         This is an internal function and should not be called directly.
@@ -234,6 +561,8 @@ class Probabilistic(Forecast):
                      measures. (default None)
         unit  -- construct bins uniformly over the total range? (default True)
         sigma -- sigma level for confidence bands. (default 1.96)
+        approx -- number of forecast buckets for an approximate curve.
+                  (default None)
 
         The threshold keyword can either be an integer, N, of
         probability thresholds to use or a list of specific
@@ -242,7 +571,8 @@ class Probabilistic(Forecast):
         over the forecast range (unit=True) or uniformly over the
         forecast distribution (unit=False).  Confidence bands are
         estimated using the binomial distribution if the bootstrap
-        function has not been previously called.
+        function has not been previously called.  If approx is set,
+        the tables come from forecast buckets instead.
 
         Return values:
         tuple of x values,
@@ -250,52 +580,14 @@ class Probabilistic(Forecast):
         tuple of (lower,upper) x-axis confidence bands,
         tuple of (lower,upper) y-axis confidence bands.
         """
-        if self._boot is None:  self.bootstrap(0)
-
-        # Copy the forecasted and oberved (plus bootstrapped) data
-        forecast,obs = [ numpy.array(col) for col in map(None, *self._data) ]
-        observed = numpy.vstack((obs,self._boot))
-
-        Nobs = obs.sum()
-
-        thresh = []
-        for obs in observed:
-            # if threshold is None, find the exact "jump" points.  These will
-            # be the places where the observed value is > 0.
-            if threshold is None:
-                thresh.append([])
-
-                for f,o in zip(forecast,obs):
-                    if o >= 1:
-                        thresh[-1].append(f)
-                    
-                thresh[-1].sort()
-
-            # If number of thresholds is given, create the thresholds array
-            elif type(threshold) is int:
-                tmp = sorted( forecast )
-
-                if unit is True:
-                    L = tmp[0]
-                    U = tmp[-1]
-
-                    dx = ( U - L ) / (threshold+1)
-
-                    thresh.append( [L + i*dx
-                                    for i in xrange(threshold+1)] )
-
-                else:
-                    NN = len(tmp)-1
-
-                    thresh.append( [tmp[int(NN*i/threshold)]
-                                    for i in xrange(threshold+1)] )
-
-            else:
-                # Make sure '0' and '1' are in threshold array
-                tmp = [float(i) for i in threshold]
-                if 0.0 not in tmp: tmp.append(0.0)
-                if 1.0 not in tmp: tmp.append(1.0)
-                thresh.append(sorted(tmp))
+        # Get the contingency tables of the observed (plus
+        # bootstrapped) data at each threshold
+        if approx is not None:
+            Ncells, Nobs, tables = self._calc_bucket_tables(approx, unit)
+        elif self._chunked:
+            Ncells, Nobs, tables = self._calc_chunked_tables(threshold, unit)
+        else:
+            Ncells, Nobs, tables = self._calc_sorted_tables(threshold, unit)
 
         if curve == 'ERROR':
             x = [1.0,]
@@ -304,38 +596,30 @@ class Probabilistic(Forecast):
             x = [1.0,]
             y = [1.0,]
 
-        pairs = []
-
-        for j in xrange(len(observed)):
-            for val in thresh[j]:
-                a = 0
-                b = 0
-                c = 0
-                d = 0
-
-                for i in xrange(len(forecast)):
-                    if forecast[i] >= val and observed[j][i] >= 1: a += 1
-                    if forecast[i] >= val and observed[j][i] == 0: b += 1
-                    if forecast[i] <  val and observed[j][i] >= 1: c += 1
-                    if forecast[i] <  val and observed[j][i] == 0: d += 1
-
-                # Calculate statistics
-                try:
-                    if curve == 'ERROR':
-                        X = (a + b) / (a + b + c + d) # Tau (alarm space)
-                        Y = c / (a + c)               # Nu (miss rate)
-                    else:
-                        X = b / (b + d)               # F (false alarm rate)
-                        Y = a / (a + c)               # H (hit rate)
-
-                    if j == 0:
-                        x.append( X )
-                        y.append( Y )
-                    else:
-                        pairs.append( (X,Y) )
-
-                except ZeroDivisionError:
-                    pass
+        PX = []
+        PY = []
+
+        for j, (a,b,c,d) in enumerate(tables):
+            if j == 0:
+                Nthresh = len(a)
+
+            # Calculate statistics, skipping thresholds where they are
+            # undefined
+            if curve == 'ERROR':
+                ok = (a + c != 0)
+                X = (a + b)[ok] / (a + b + c + d)[ok] # Tau (alarm space)
+                Y = c[ok] / (a + c)[ok]               # Nu (miss rate)
+            else:
+                ok = (b + d != 0) & (a + c != 0)
+                X = b[ok] / (b + d)[ok]               # F (false alarm rate)
+                Y = a[ok] / (a + c)[ok]               # H (hit rate)
+
+            if j == 0:
+                x.extend( X.tolist() )
+                y.extend( Y.tolist() )
+            else:
+                PX.append( X )
+                PY.append( Y )
 
         if curve == 'ERROR':
             x.append( 0.0 )
@@ -349,42 +633,36 @@ class Probabilistic(Forecast):
 
         siglevel = scipy.special.erf(sigma/numpy.sqrt(2))
 
-        for i in xrange(len(thresh[0])):
-            tmp = sorted([X for (X,Y) in pairs
-                          if X <= x[i+1] and abs(Y-y[i+1]) <= .01],
-                         reverse=True)
-            try:
-                dxl = x[i+1] - tmp[int(siglevel*len(tmp))]
-            except:
-                dxl = x[i+1] - CI(x[i+1], len(forecast)-Nobs, siglevel)[0]
+        # Index the bootstrap points once along each axis.  Each band
+        # only looks at the points lying within .01 of the curve point
+        # on the other axis (see tools.BandIndex).
+        PX = numpy.concatenate(PX) if PX else numpy.zeros(0)
+        PY = numpy.concatenate(PY) if PY else numpy.zeros(0)
 
-            tmp = sorted([X for (X,Y) in pairs
-                          if X >= x[i+1] and abs(Y-y[i+1]) <= .01],
-                         reverse=False)
-            try:
-                dxu = tmp[int(siglevel*len(tmp))] - x[i+1]
-            except:
-                dxu = CI(x[i+1], len(forecast)-Nobs, siglevel)[1] - x[i+1]
+        # Start from the binomial bands of every curve point at once,
+        # and replace them wherever there are bootstrap bands
+        X = numpy.array(x[1:Nthresh+1])
+        Y = numpy.array(y[1:Nthresh+1])
+
+        lower, upper = CI(X, Ncells-Nobs, siglevel)
+        dxl, dxu = X - lower, upper - X
+
+        lower, upper = CI(Y, Nobs, siglevel)
+        dyl, dyu = Y - lower, upper - Y
+
+        if len(PX):
+            lower, upper = BandIndex(PY, PX).limits(Y, X, .01, siglevel)
+
+            dxl = numpy.where(numpy.isnan(lower), dxl, X - lower)
+            dxu = numpy.where(numpy.isnan(upper), dxu, upper - X)
             ##
-            tmp = sorted([Y for (X,Y) in pairs
-                          if Y <= y[i+1] and abs(X-x[i+1]) <= .01],
-                         reverse=True)
-            try:
-                dyl = y[i+1] - tmp[int(siglevel*len(tmp))]
-            except:
-                dyl = y[i+1] - CI(y[i+1], Nobs, siglevel)[0]
-            
-            tmp = sorted([Y for (X,Y) in pairs
-                          if Y >= y[i+1] and abs(X-x[i+1]) <= .01],
-                         reverse=False)
-            try:
-                dyu = tmp[int(siglevel*len(tmp))] - y[i+1]
-            except:
-                dyu = CI(y[i+1], Nobs, siglevel)[1] - y[i+1]
-            ###
-                         
-            dx.append( (dxl,dxu) )
-            dy.append( (dyl,dyu) )
+            lower, upper = BandIndex(PX, PY).limits(X, Y, .01, siglevel)
+
+            dyl = numpy.where(numpy.isnan(lower), dyl, Y - lower)
+            dyu = numpy.where(numpy.isnan(upper), dyu, upper - Y)
+
+        dx.extend( zip(dxl.tolist(), dxu.tolist()) )
+        dy.extend( zip(dyl.tolist(), dyu.tolist()) )
 
         dx.append( (0.0,0.0) )
         dy.append( (0.0,0.0) )
@@ -394,8 +672,435 @@ class Probabilistic(Forecast):
 
     #-------------------------------------------------------------------------#
 
+    def _calc_thresholds(self, threshold, unit, L, U, select):
+        """Calculate the fixed probability thresholds of a curve.
+
+        This is an internal function and should not be called directly.
+
+        Keyword arguments:
+        threshold -- number or list of thresholds (see _calc_curve).
+        unit      -- sample thresholds uniformly over the total range?
+        L, U      -- lowest and highest forecast.
+        select    -- function returning the sorted forecasts at a list
+                     of ranks.
+
+        Return value:
+        list of thresholds, or None if they follow the events.
+        """
+
+        # If threshold is None, the exact "jump" points are found
+        # separately for each set of observations.
+        if threshold is None:
+            fixed = None
+
+        # If number of thresholds is given, create the thresholds array
+        elif type(threshold) is int:
+            if unit is True:
+                dx = ( U - L ) / (threshold+1)
+
+                fixed = [L + i*dx for i in xrange(threshold+1)]
+
+            else:
+                NN = len(self._data)-1
+
+                fixed = list(select([int(NN*i/threshold)
+                                     for i in xrange(threshold+1)]))
+
+        else:
+            # Make sure '0' and '1' are in threshold array
+            tmp = [float(i) for i in threshold]
+            if 0.0 not in tmp: tmp.append(0.0)
+            if 1.0 not in tmp: tmp.append(1.0)
+            fixed = sorted(tmp)
+
+        # End _calc_thresholds(self, ...)
+        return fixed
+
+    #-------------------------------------------------------------------------#
+
+    def _calc_sorted_tables(self, threshold, unit):
+        """Calculate curve contingency tables from the sorted forecasts.
+
+        This is an internal function and should not be called directly.
+
+        The forecasts are sorted once.  Every threshold sweep, for the
+        observed data and for each bootstrap replicate, then reduces
+        to binary searches over this order (see _calc_table).
+
+        Return values:
+        number of forecast cells,
+        number of observed events,
+        iterator over the (a,b,c,d) tables of the observed data and
+        then of each bootstrap replicate.
+        """
+        # Without a bootstrap there are no replicates.  (bootstrap(0)
+        # would also clear the memoized results.)
+        if self._boot is None:  self._boot = Replicates(len(self._data))
+
+        # Get the forecasted and oberved data
+        forecast,obs = self._data.F, self._data.O
+
+        order = numpy.argsort(forecast, kind='mergesort')
+        sortF = forecast[order]
+
+        # Position of each forecast cell in the sorted order
+        rank = numpy.empty(len(order), dtype=int)
+        rank[order] = numpy.arange(len(order))
+
+        fixed = self._calc_thresholds(threshold, unit, sortF[0], sortF[-1],
+                                      lambda ranks: sortF[ranks])
+
+        def tables():
+            # Loop over the observed (plus bootstrapped) data
+            for j in xrange(1 + len(self._boot)):
+                # Find the sorted positions of the cells with events
+                if j == 0:
+                    events = numpy.flatnonzero(obs[order] >= 1)
+                else:
+                    events = numpy.sort(rank[self._boot.row(j-1)[0]])
+
+                # if threshold is None, find the exact "jump" points.
+                # These will be the places where the observed value
+                # is > 0.
+                if fixed is None:
+                    thresh = sortF[events]
+                else:
+                    thresh = fixed
+
+                yield self._calc_table(sortF, events, thresh)
+
+        # End _calc_sorted_tables(self, ...)
+        return len(forecast), obs.sum(), tables()
+
+    #-------------------------------------------------------------------------#
+
+    def _calc_chunked_tables(self, threshold, unit):
+        """Calculate curve contingency tables one chunk at a time.
+
+        This is an internal function and should not be called directly.
+
+        A first pass finds the forecast range and the number of
+        events.  With threshold=None the forecasts of the cells with
+        events are then gathered as the thresholds.  A last pass
+        counts, for each chunk, the forecasts (and the forecasts with
+        events) below each threshold with binary searches.  The sums
+        over all chunks give exactly the tables of _calc_table.
+
+        Return values:
+        number of forecast cells,
+        number of observed events,
+        iterator over the single (a,b,c,d) table of the observed data.
+        """
+        L, U = numpy.inf, -numpy.inf
+        Nobs = 0
+        Nevents = 0
+
+        for F,O in self._data.chunks():
+            L = min(L, F.min())
+            U = max(U, F.max())
+            Nobs += O.sum()
+            Nevents += numpy.count_nonzero(O >= 1)
+
+        fixed = self._calc_thresholds(threshold, unit, L, U,
+                                      self._data.select)
+
+        # if threshold is None, find the exact "jump" points.  Only
+        # then are the forecasts of the cells with events gathered.
+        if fixed is None:
+            thresh = numpy.sort(numpy.concatenate(
+                [ F[O >= 1] for F,O in self._data.chunks() ]))
+        else:
+            thresh = numpy.asarray(fixed)
+
+        below = numpy.zeros(len(thresh), dtype=int)
+        c = numpy.zeros(len(thresh), dtype=int)
+
+        for F,O in self._data.chunks():
+            below += numpy.searchsorted(numpy.sort(F), thresh, side='left')
+            c += numpy.searchsorted(numpy.sort(F[O >= 1]), thresh,
+                                    side='left')
+
+        N = len(self._data)
+
+        d = below - c
+        a = Nevents - c
+        b = (N - Nevents) - d
+
+        # End _calc_chunked_tables(self, ...)
+        return N, Nobs, iter([ (a, b, c, d) ])
+
+    #-------------------------------------------------------------------------#
+
+    def _calc_buckets(self, approx, unit):
+        """Quantize the forecasts into approx buckets.
+
+        This is an internal function and should not be called directly.
+
+        With unit=True the buckets have uniform width over the
+        forecast range.  Otherwise a histogram of 64*approx uniform
+        bins is built first, and runs of neighbouring bins are merged
+        into buckets holding roughly the same number of cells.  Either
+        way the forecasts are placed by arithmetic, not by searching,
+        and counted with bincount, in O(N + approx).
+
+        Return values:
+        function mapping an array of forecasts onto bucket numbers,
+        array of cells with events in each bucket,
+        array of cells without events in each bucket,
+        number of observed events.
+        """
+        L, U = numpy.inf, -numpy.inf
+        for F,O in self._data.chunks():
+            L = min(L, F.min())
+            U = max(U, F.max())
+
+        M = approx if unit is True else 64*approx
+        scale = M / (U - L) if U > L else 0.0
+
+        def fine(F):
+            return numpy.minimum( ((F - L)*scale).astype(int) , M-1 )
+
+        if unit is True:
+            lookup = numpy.arange(approx)
+
+        else:
+            counts = numpy.zeros(M, dtype=int)
+            for F,O in self._data.chunks():
+                counts += numpy.bincount(fine(F), minlength=M)
+
+            # Merge the bins by the number of cells before each one
+            before = numpy.cumsum(counts) - counts
+            lookup = numpy.minimum( approx*before // len(self._data) ,
+                                    approx-1 )
+
+        def bucket(F):
+            return lookup[fine(F)]
+
+        n1 = numpy.zeros(approx, dtype=int)
+        n0 = numpy.zeros(approx, dtype=int)
+        Nobs = 0
+
+        for F,O in self._data.chunks():
+            index = bucket(F)
+
+            n1 += numpy.bincount(index[O >= 1], minlength=approx)
+            n0 += numpy.bincount(index[O == 0], minlength=approx)
+            Nobs += O.sum()
+
+        # End _calc_buckets(self, ...)
+        return bucket, n1, n0, Nobs
+
+    #-------------------------------------------------------------------------#
+
+    def _calc_bucket_tables(self, approx, unit):
+        """Calculate curve contingency tables from forecast buckets.
+
+        This is an internal function and should not be called directly.
+
+        A forecast is taken to be "yes" at the k-th threshold when it
+        lies in bucket k or above, so every table follows from the
+        cumulative bucket counts.  Bootstrap replicates only need the
+        buckets of the cells that received events.
+
+        Return values:
+        number of forecast cells,
+        number of observed events,
+        iterator over the (a,b,c,d) tables of the observed data and
+        then of each bootstrap replicate.
+        """
+        bucket, n1, n0, Nobs = self._cached(self._calc_buckets, approx, unit)
+
+        N = len(self._data)
+        n = n1 + n0
+
+        # Count the forecasts below each bucket
+        below = numpy.cumsum(n) - n
+
+        if self._chunked:
+            rows = 0
+        else:
+            if self._boot is None:  self._boot = Replicates(N)
+
+            rows = len(self._boot)
+            index = bucket(self._data.F)
+
+        def tables():
+            for j in xrange(1 + rows):
+                if j == 0:
+                    events = n1
+                else:
+                    events = numpy.bincount(index[self._boot.row(j-1)[0]],
+                                            minlength=approx)
+
+                # Count the events below each bucket
+                c = numpy.cumsum(events) - events
+                d = below - c
+                a = events.sum() - c
+                b = (N - events.sum()) - d
+
+                yield a, b, c, d
+
+        # End _calc_bucket_tables(self, ...)
+        return N, Nobs, tables()
+
+    #-------------------------------------------------------------------------#
+
+    def approx_bound(self, approx, unit=True, curve='ROC'):
+        """Return the area error bound of an approximate curve.
+
+        Keyword arguments:
+        approx -- number of forecast buckets.
+        unit   -- construct buckets uniformly over the total range?
+                  (default True)
+        curve  -- 'ROC' or 'ERROR'. (default 'ROC')
+
+        The exact curve is the one through every distinct forecast
+        value.  Within each bucket, it runs through a box of
+        width n0/N0 and height n1/N1 (n/N and n1/N1 for the error
+        diagram), and the approximate curve crosses it in a straight
+        line.  The two areas can differ by at most half of the box.
+
+        Return value:
+        bound on the difference between the approximate and exact
+        areas.
+        """
+        self._check_pairs('Approx')
+
+        bucket, n1, n0, Nobs = self._cached(self._calc_buckets, approx, unit)
+
+        N1 = n1.sum()
+
+        if curve == 'ERROR':
+            n = n1 + n0
+            bound = 0.5 * (n*n1).sum() / (n.sum() * N1)
+        else:
+            bound = 0.5 * (n1*n0).sum() / (N1 * n0.sum())
+
+        # End approx_bound(self, ...)
+        return bound
+
+    #-------------------------------------------------------------------------#
+
+    def contingency_sweep(self, thresholds):
+        """Calculate 2x2 contingency table scores at many thresholds.
+
+        Keyword arguments:
+        thresholds -- probability thresholds for issuing a "yes" forecast.
+
+        A forecast is taken to be "yes" when it is greater than or
+        equal to the threshold, and a cell with any observed events
+        counts as one "yes" observation, as for roc().  The tables at
+        every threshold come from one sorted copy of the forecasts
+        (see _calc_table), and all scores are computed at once by
+        ContingencyTable.batch_stats.
+
+        Sample usage:
+            sweep = forecast.contingency_sweep(numpy.linspace(0, 1, 101))
+            best = sweep['ETS'].argmax()
+
+        Return value:
+        dictionary of arrays of test results indexed by test, with one
+        entry per threshold.  The 'TABLE' entry holds the (a,b,c,d)
+        table at each threshold.
+        """
+        self._check_pairs('Contingency sweep')
+
+        thresh = numpy.asarray(thresholds, dtype=float).ravel()
+
+        if self._chunked:
+            N = len(self._data)
+
+            below = numpy.zeros(len(thresh), dtype=int)
+            c = numpy.zeros(len(thresh), dtype=int)
+            Nevents = 0
+
+            for F,O in self._data.chunks():
+                events = F[O >= 1]
+
+                below += numpy.searchsorted(numpy.sort(F), thresh,
+                                            side='left')
+                c += numpy.searchsorted(numpy.sort(events), thresh,
+                                        side='left')
+                Nevents += len(events)
+
+            d = below - c
+            a = Nevents - c
+            b = (N - Nevents) - d
+
+        else:
+            sortF, events = self._cached(self._calc_sorted)
+
+            a, b, c, d = self._calc_table(sortF, events, thresh)
+
+        tables = numpy.column_stack((a, b, c, d))
+
+        results = ContingencyTable.batch_stats(tables)
+        results['TABLE'] = tables
+
+        # End contingency_sweep(self, ...)
+        return results
+
+    #-------------------------------------------------------------------------#
+
+    def _calc_sorted(self):
+        """Sort the forecasts and find the positions of the events.
+
+        This is an internal function and should not be called directly.
+
+        Return values:
+        array of forecasts, sorted into increasing order,
+        sorted array of positions in it that saw an event.
+        """
+        forecast,obs = self._data.F, self._data.O
+
+        order = numpy.argsort(forecast, kind='mergesort')
+
+        # End _calc_sorted(self)
+        return forecast[order], numpy.flatnonzero(obs[order] >= 1)
+
+    #-------------------------------------------------------------------------#
+
+    def _calc_table(self, sortF, events, thresh):
+        """Calculate 2x2 contingency table entries at many thresholds.
+
+        This is an internal function and should not be called directly.
+
+        Keyword arguments:
+        sortF  -- array of forecasts, sorted into increasing order.
+        events -- sorted array of positions in sortF that saw an event.
+        thresh -- probability thresholds for issuing a "yes" forecast.
+
+        A forecast is taken to be "yes" when it is greater than or
+        equal to the threshold.  Since the forecasts are sorted, the
+        number of "no" forecasts at each threshold is found with a
+        binary search, and the number of those that saw an event with
+        a second binary search over the event positions.  The whole
+        sweep costs O(T log N) for N forecasts and T thresholds.
+
+        Return values:
+        array of n(F=yes, O=yes) counts,
+        array of n(F=yes, O=no) counts,
+        array of n(F=no, O=yes) counts,
+        array of n(F=no, O=no) counts.
+        """
+        N = len(sortF)
+
+        # Count the forecasts below each threshold
+        below = numpy.searchsorted(sortF, thresh, side='left')
+
+        # Count the events below each threshold
+        c = numpy.searchsorted(events, below, side='left')
+        d = below - c
+        a = len(events) - c
+        b = (N - len(events)) - d
+
+        # End _calc_table(self, ...)
+        return a, b, c, d
+
+    #-------------------------------------------------------------------------#
+
     def roc_area(self, x=None, y=None, dx=None, dy=None, model=None,
-                 threshold=None, unit=True, sigma=1.96):
+                 threshold=None, unit=True, sigma=1.96, approx=None):
         """Calculate and return roc diagram area scores.
 
         Keyword arguments:
@@ -409,9 +1114,11 @@ class Probabilistic(Forecast):
                      fraction of alarm space. (default None)
         unit  -- construct bins uniformly over the total range? (default True)
         sigma -- sigma level for confidence bands. (default 1.96)
+        approx -- number of forecast buckets for an approximate curve.
+                  (default None)
 
         If no values area passed in for x,y,dx,dy the values for
-        threshold,unit,sigma will be used to generate new curve
+        threshold,unit,sigma,approx will be used to generate new curve
         values.  ROC diagrams are measured by their area below the
         curve.  Error diagrams are measured by their area above the
         curve.  To calculate an area skill score, a reference model
@@ -429,14 +1136,14 @@ class Probabilistic(Forecast):
         tuple of (lower,upper) area skill score confidence bands.
         """
         if ( x == None or y == None ):
-            x,y,dx,dy = self.roc(threshold, unit, sigma)
+            x,y,dx,dy = self.roc(threshold, unit, sigma, approx)
 
         return self._calc_curve_area('ROC', x, y, dx, dy, model)
 
     #-------------------------------------------------------------------------#
 
     def error_area(self, x=None, y=None, dx=None, dy=None, model=None,
-                   threshold=None, unit=True, sigma=1.96):
+                   threshold=None, unit=True, sigma=1.96, approx=None):
         """Calculate and return error diagram area scores.
 
         Keyword arguments:
@@ -450,9 +1157,11 @@ class Probabilistic(Forecast):
                      fraction of alarm space. (default None)
         unit  -- construct bins uniformly over the total range? (default True)
         sigma -- sigma level for confidence bands. (default 1.96)
+        approx -- number of forecast buckets for an approximate curve.
+                  (default None)
 
         If no values area passed in for x,y,dx,dy the values for
-        threshold,unit,sigma will be used to generate new curve
+        threshold,unit,sigma,approx will be used to generate new curve
         values.  ROC diagrams are measured by their area below the
         curve.  Error diagrams are measured by their area above the
         curve.  To calculate an area skill score, a reference model
@@ -470,12 +1179,191 @@ class Probabilistic(Forecast):
         tuple of (lower,upper) area skill score confidence bands.
         """
         if ( x == None or y == None ):
-            x,y,dx,dy = self.error(threshold, unit, sigma)
+            x,y,dx,dy = self.error(threshold, unit, sigma, approx)
 
         return self._calc_curve_area('ERROR', x, y, dx, dy, model)
 
     #-------------------------------------------------------------------------#
 
+    def auc(self, sigma=1.96, weighted=False):
+        """Calculate and return the exact area under the ROC curve.
+
+        Keyword arguments:
+        sigma    -- sigma level for confidence interval. (default 1.96)
+        weighted -- count every observed event separately? (default False)
+
+        The area is the Mann-Whitney statistic: the chance that a
+        randomly chosen cell with an event was given a higher forecast
+        than a randomly chosen cell without one, with tied forecasts
+        counting one half.  By default, as in roc(), a cell with any
+        number of events counts once.  If weighted is True, a cell
+        with k events counts as k events.
+
+        The (unweighted) area equals the trapezoid area of the ROC
+        curve traced through every distinct forecast value, that is
+        roc_area(threshold=numpy.unique(forecasts)), but is found in
+        O(N log N) without building the curve.  It is not in general
+        the area of the default roc_area(): the default curve only
+        has points at the forecasts of the cells with events, and
+        joins them, and the highest of them to (0,0), with straight
+        lines.  Wherever forecasts without events lie between or
+        above those points, the default area differs.
+
+        The standard error is DeLong's analytic estimate, built from
+        the placement values of the cells with and without events, so
+        no bootstrap is needed.  The confidence interval is the area
+        plus or minus sigma standard errors, clipped to [0,1].
+
+        Return values:
+        area under the ROC curve,
+        standard error of the area,
+        tuple of (lower,upper) confidence interval.
+        """
+        self._check_pairs('AUC')
+
+        # End auc(self, ...)
+        return self._cached(self._calc_auc, sigma, weighted)
+
+    #-------------------------------------------------------------------------#
+
+    def _calc_auc(self, sigma, weighted):
+        """Calculate the exact ROC area and its DeLong standard error.
+
+        This is an internal function and should not be called directly.
+        Instead, call the auc wrapper function.
+        """
+        if self._chunked:
+            return self._calc_chunked_auc(sigma, weighted)
+
+        # Get views of the Forecast and the observations
+        F,O = self._data.F, self._data.O
+
+        # Count the events and non-events in each cell
+        if weighted:
+            pos = numpy.asarray(O, dtype=float)
+        else:
+            pos = numpy.asarray(O >= 1, dtype=float)
+        neg = numpy.asarray(O == 0, dtype=float)
+
+        # Group the cells by distinct forecast value.  Cells sharing
+        # a value are tied.
+        values, inverse = numpy.unique(F, return_inverse=True)
+
+        n1 = numpy.bincount(inverse, weights=pos, minlength=len(values))
+        n0 = numpy.bincount(inverse, weights=neg, minlength=len(values))
+
+        N1 = n1.sum()
+        N0 = n0.sum()
+
+        if N1 == 0 or N0 == 0:
+            raise ValueError("ROC area needs both events and non-events "
+                             "(%d,%d)." % (N1, N0))
+
+        # Placement values: the fraction of the other group ranked
+        # below each event, or above each non-event, ties counting half
+        V10 = ( (numpy.cumsum(n0) - n0) + 0.5*n0 ) / N0
+        V01 = ( (N1 - numpy.cumsum(n1)) + 0.5*n1 ) / N1
+
+        # Calculate the Mann-Whitney area
+        area = (n1*V10).sum() / N1
+
+        # Calculate the DeLong variance
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            S10 = (n1*(V10-area)**2).sum() / (N1 - 1)
+            S01 = (n0*(V01-area)**2).sum() / (N0 - 1)
+
+        se = numpy.sqrt(S10/N1 + S01/N0)
+
+        lower = max(area - sigma*se, 0.0)
+        upper = min(area + sigma*se, 1.0)
+
+        # End _calc_auc(self, ...)
+        return area, se, (lower, upper)
+
+    #-------------------------------------------------------------------------#
+
+    def _calc_chunked_auc(self, sigma, weighted):
+        """Calculate the exact ROC area one chunk at a time.
+
+        This is an internal function and should not be called directly.
+        Instead, call the auc wrapper function.
+
+        A first pass gathers the forecasts of the cells with events.
+        A second pass places the non-events of each chunk among them
+        with binary searches, summing the placement values needed for
+        the area and the DeLong variance.
+        """
+        events = []
+        counts = []
+        N0 = 0
+
+        for F,O in self._data.chunks():
+            hit = O >= 1
+            events.append( F[hit] )
+            counts.append( O[hit] if weighted else numpy.ones(hit.sum()) )
+            N0 += (O == 0).sum()
+
+        # Group the event cells by distinct forecast value
+        values, inverse = numpy.unique(numpy.concatenate(events),
+                                       return_inverse=True)
+
+        n1 = numpy.bincount(inverse, weights=numpy.concatenate(counts),
+                            minlength=len(values))
+
+        N1 = n1.sum()
+
+        if N1 == 0 or N0 == 0:
+            raise ValueError("ROC area needs both events and non-events "
+                             "(%d,%d)." % (N1, N0))
+
+        # Events at or below each distinct value
+        cum1 = numpy.concatenate(( [0.0] , numpy.cumsum(n1) ))
+
+        below0 = numpy.zeros(len(values))
+        equal0 = numpy.zeros(len(values))
+        sumV01 = 0.0
+        sumV01sq = 0.0
+
+        for F,O in self._data.chunks():
+            F0 = numpy.sort(F[O == 0])
+
+            # Non-events below and tied with each event value
+            left  = numpy.searchsorted(F0, values, side='left')
+            right = numpy.searchsorted(F0, values, side='right')
+
+            below0 += left
+            equal0 += right - left
+
+            # Placement of each non-event among the events
+            left  = numpy.searchsorted(values, F0, side='left')
+            right = numpy.searchsorted(values, F0, side='right')
+
+            V01 = ( (N1 - cum1[right]) + 0.5*(cum1[right] - cum1[left]) ) / N1
+
+            sumV01 += V01.sum()
+            sumV01sq += (V01*V01).sum()
+
+        # Placement values of the events, ties counting half
+        V10 = ( below0 + 0.5*equal0 ) / N0
+
+        # Calculate the Mann-Whitney area
+        area = (n1*V10).sum() / N1
+
+        # Calculate the DeLong variance
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            S10 = (n1*(V10-area)**2).sum() / (N1 - 1)
+            S01 = (sumV01sq - 2*area*sumV01 + N0*area*area) / (N0 - 1)
+
+        se = numpy.sqrt(S10/N1 + S01/N0)
+
+        lower = max(area - sigma*se, 0.0)
+        upper = min(area + sigma*se, 1.0)
+
+        # End _calc_chunked_auc(self, ...)
+        return area, se, (lower, upper)
+
+    #-------------------------------------------------------------------------#
+
     def _calc_curve_area(self, curve, x, y, dx, dy, model):
         """Calculate and return assorted (ROC, error, etc) diagram area data.
 
@@ -575,7 +1463,9 @@ class Probabilistic(Forecast):
 
     #-------------------------------------------------------------------------#
 
-    def bootstrap(self, N, observed=True, model=None, seed=None):
+    def bootstrap(self, N, observed=True, model=None, seed=None,
+                  method='multinomial', workers=None, executor=None,
+                  lazy=False):
         """Create synthetic observed datasets based on a given distribution.
 
         Keyword arguments:
@@ -585,38 +1475,135 @@ class Probabilistic(Forecast):
         model    -- Distribution model to draw from if not drawing from
                     actual obersvations. (default None)
         seed     -- Seed value for random number generator. (default None)
-
-        If no seed value is set, use the current time to initialize
-        the random number generator.
+        method   -- Sampling method, one of 'multinomial', 'cdf' or
+                    'alias'. (default 'multinomial')
+        workers  -- Number of worker processes to use. (default None)
+        executor -- Existing pool or executor to use. (default None)
+        lazy     -- Redraw the datasets when needed instead of storing
+                    them? (default False)
+
+        With the 'multinomial' method, the event counts of each
+        synthetic dataset are drawn over all cells at once from a
+        multinomial distribution.  The 'cdf' and 'alias' methods draw
+        the events of each dataset from a GenericCDF object, using
+        binary-search or alias-table sampling.  Only cells with a
+        non-zero probability take part in the draws.
+
+        Each synthetic dataset gets its own random number generator,
+        seeded from a master generator initialized with seed.  A
+        fixed seed therefore gives the same synthetic datasets on any
+        machine, however the work is divided.  If no seed value is
+        set, the master generator is initialized from the system
+        entropy source (or the current time).
+
+        If workers is set, the datasets are split across a new pool
+        of that many processes.  The sampling distribution is handed
+        to each worker once, when it starts, and the tasks only carry
+        seeds.  Alternatively, any object with a map(function,
+        iterable) method, such as a multiprocessing.Pool or a
+        concurrent.futures executor, can be passed in as executor.
+        The caller is then responsible for shutting it down.  Since
+        such an executor is already running, the distribution is sent
+        with every task, and the datasets are split into only one
+        block per CPU.
+
+        The datasets are stored sparsely, keeping only the cells that
+        received events (see tools.Replicates).  If lazy is True, only
+        the seeds are stored and each dataset is redrawn whenever the
+        curves need it, so the stored replicates no longer grow with N
+        times the number of events.  Building a curve still holds all
+        N replicate curves at once, so its peak memory grows with N
+        times the number of thresholds (about the number of events
+        with threshold=None).  Either way, the storage size in bytes
+        is reported by the nbytes attribute of the _boot object.
 
         Return values:
         None
         """
 
-        # Separate the Forecast from the observations
-        F,O = [ numpy.array(col) for col in map(None, *self._data) ]
+        self._check_pairs('Bootstrap')
+
+        if self._chunked:
+            raise Exception("Bootstrap needs the data in memory, which "
+                            "memory-mapped objects do not keep.")
+
+        if method not in ('multinomial', 'cdf', 'alias'):
+            raise ValueError("Bootstrap method must be 'multinomial', "
+                             "'cdf' or 'alias' (%s)." % method)
+
+        # Get views of the Forecast and the observations
+        F,O = self._data.F, self._data.O
+
+        # Count the number of target observations
+        NN = O.sum()
 
         if observed is True:
-            # Create a CDF based on Observed distribution
-            myCDF = GenericCDF(O, seed=seed)
+            # Draw from the Observed distribution
+            pvals = numpy.asarray(O, dtype=float)
         else:
-            # Create a CDF based on Model distribution
+            # Draw from the Model distribution
             if model is None:
-                myCDF = GenericCDF(F)
+                pvals = numpy.asarray(F, dtype=float)
             else:
-                myCDF = GenericCDF(model)
+                pvals = numpy.asarray(model, dtype=float)
 
-        # Count the number of target observations
-        NN = O.sum()
+        # Reset the memoized results
+        self._cache.clear()
 
         # Create the _boot object
-        self._boot = numpy.zeros( (N , len(F)) , dtype=int )
+        if N == 0:
+            self._boot = Replicates(len(F))
+            return None
+
+        # Only cells with a chance of an event take part in the draws
+        support = numpy.flatnonzero(pvals)
+        pvals = pvals[support] / pvals.sum()
+
+        # Seed one random number generator per synthetic dataset
+        seeds = numpy.random.RandomState(seed).randint(2**32, size=N,
+                                                       dtype=numpy.uint32)
+
+        if lazy:
+            self._boot = LazyReplicates(len(F),
+                                        (method, NN, support, pvals, seeds))
+
+        elif workers is None and executor is None:
+            # Fill the _boot object in this process
+            blocks = [ draw_replicates( (method, NN, support, pvals,
+                                         seeds) ) ]
+            self._boot = Replicates(len(F), blocks)
+
+        elif executor is None:
+            # Each worker gets the distribution once, when it starts,
+            # and the tasks only carry seeds
+            pool = multiprocessing.Pool(workers, share_distribution,
+                                        (method, NN, support, pvals))
+
+            # Split the datasets into blocks, a few per worker
+            Nblocks = min(N, 4*workers)
+
+            try:
+                blocks = pool.map(draw_shared,
+                                  numpy.array_split(seeds, Nblocks))
+            finally:
+                pool.close()
+                pool.join()
+
+            # Fill the _boot object
+            self._boot = Replicates(len(F), blocks)
+
+        else:
+            # An outside executor cannot be given the distribution
+            # up front, so every task carries it.  Use one block per
+            # CPU to send it as few times as possible.
+            Nblocks = min(N, multiprocessing.cpu_count())
+            tasks = [ (method, NN, support, pvals, block)
+                      for block in numpy.array_split(seeds, Nblocks) ]
+
+            blocks = list(executor.map(draw_replicates, tasks))
 
-        # Fill the _boot object
-        for i in xrange(N):
-            for n in xrange(NN):
-                indx = myCDF.draw()
-                self._boot[i][indx] += 1
+            # Fill the _boot object
+            self._boot = Replicates(len(F), blocks)
 
         # End bootstrap(self, ...)
         return None
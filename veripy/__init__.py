@@ -27,15 +27,38 @@ def license():
 
 #-----------------------------------------------------------------------------#
 
-__all__ = []
+# Only NumPy and SciPy are needed here.  The plotting routines, and
+# matplotlib with them, are loaded on first use (see tools).
+import sys
 
-for subpackage in ['ContingencyTable',
-                   'MultiContingencyTable',
-                   'Probabilistic',
-                   'Continuous',
-                   'tools']:
+from ContingencyTable import ContingencyTable
+from MultiContingencyTable import MultiContingencyTable
+from Probabilistic import Probabilistic
+from Continuous import Continuous
 
-    exec 'from ' + subpackage + ' import *'
-    __all__.append( subpackage )
+import tools
+
+# Tools that have always been offered at the top level
+from tools import CI, ConfidenceIntervals, GenericCDF
+
+__all__ = ['ContingencyTable',
+           'MultiContingencyTable',
+           'Probabilistic',
+           'Continuous',
+           'tools']
+
+# makeplots and its plotting routines, looked up in tools on first use
+_lazy = tools._lazy
+_source = tools.__name__
+
+###############################################################################
+
+_module = tools._LazyModule(__name__, __doc__)
+_module.__dict__.update(sys.modules[__name__].__dict__)
+
+# Keep the original module alive, since its functions use its globals
+_module._original = sys.modules[__name__]
+
+sys.modules[__name__] = _module
 
 ###############################################################################
@@ -0,0 +1,398 @@
+# Benchmarks.py
+#
+# Copyright (c) James R. Holliday, jrholliday@gmail.com
+# See 'license.txt' for licensing and usage restrictions.
+#
+###############################################################################
+
+"""Scaling benchmarks for forecast verification.
+
+This module exports the run_case and run_suite functions.  A case
+times every operation of one workload ('continuous', 'probabilistic'
+or 'contingency') on one seeded data set.  A suite runs each case in
+a fresh interpreter, so that its peak memory is its own, and writes
+all results to a JSON file.
+"""
+
+###############################################################################
+
+from __future__ import division
+
+import json
+import os
+import platform
+import subprocess
+import sys
+import timeit
+
+from Generators import continuous_data, probabilistic_data, categorical_data
+
+import numpy
+import scipy
+
+###############################################################################
+
+def _peak_rss():
+    """Return the peak resident memory of this process, in bytes.
+
+    This is an internal function and should not be called directly.
+    Returns None where the resource module is not available.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # Linux reports kilobytes, Mac OS X reports bytes
+    if sys.platform != 'darwin':
+        peak *= 1024
+
+    # End _peak_rss()
+    return peak
+
+#-----------------------------------------------------------------------------#
+
+class _Timer(object):
+    """
+    This class times benchmark operations and keeps their results.
+    It is an internal class and should not be used directly.
+    """
+
+    #-------------------------------------------------------------------------#
+
+    def __init__(self, forecast=None):
+        """Initialize _Timer object.
+
+        Keyword arguments:
+        forecast -- forecast object whose result cache is cleared
+                    before each operation. (default None)
+        """
+        self.forecast = forecast
+        self.results = []
+
+    #-------------------------------------------------------------------------#
+
+    def __call__(self, op, rows, function, *args, **kwargs):
+        """Time function(*args, **kwargs) as operation op on rows rows.
+
+        Return value:
+        result of the function call.
+        """
+
+        # Every operation does its full work, not a cache lookup
+        if self.forecast is not None:
+            self.forecast._cache.clear()
+
+        start = timeit.default_timer()
+        result = function(*args, **kwargs)
+        seconds = timeit.default_timer() - start
+
+        self.results.append({'op'       : op,
+                             'rows'     : rows,
+                             'seconds'  : seconds,
+                             'peak_rss' : _peak_rss()})
+
+        # End __call__(self, ...)
+        return result
+
+#-----------------------------------------------------------------------------#
+
+def _environ():
+    """Return an environment in which child interpreters find veripy.
+
+    This is an internal function and should not be called directly.
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    root = os.path.dirname(os.path.dirname(here))
+
+    env = dict(os.environ)
+
+    paths = [ path for path in env.get('PYTHONPATH', '').split(os.pathsep)
+              if path ]
+    env['PYTHONPATH'] = os.pathsep.join([root] + paths)
+
+    # End _environ()
+    return env
+
+###############################################################################
+
+def _add_pairs(forecast, F, O):
+    """Add forecast/observed pairs one at a time.
+
+    This is an internal function and should not be called directly.
+    """
+    for f,o in zip(F.tolist(), O.tolist()):
+        forecast.add_data(f, o)
+
+    # End _add_pairs(...)
+    return None
+
+#-----------------------------------------------------------------------------#
+
+def _continuous_case(N, seed, options):
+    """Time the Continuous operations.
+
+    This is an internal function and should not be called directly.
+    """
+    from veripy import Continuous
+
+    F, O = continuous_data(N, seed)
+    pairs = min(N, options['pairs'])
+
+    timer = _Timer()
+    timer('add_data', pairs, _add_pairs, Continuous(), F[:pairs], O[:pairs])
+
+    data = Continuous()
+    timer('add_data_array', N, data.add_data_array, F, O)
+
+    timer.forecast = data
+    timer('stats', N, data.stats)
+    timer('histogram', N, data.histogram, options['bins'])
+    for kind in (0, 1, 2):
+        timer('scatter(%d)' % kind, N, data.scatter, kind)
+
+    stream = Continuous(streaming=True)
+    timer('add_data_array(streaming)', N, stream.add_data_array, F, O)
+
+    # End _continuous_case(...)
+    return timer.results
+
+#-----------------------------------------------------------------------------#
+
+def _probabilistic_case(N, seed, options):
+    """Time the Probabilistic operations.
+
+    This is an internal function and should not be called directly.
+    """
+    from veripy import Probabilistic
+
+    F, O = probabilistic_data(N, seed)
+    pairs = min(N, options['pairs'])
+
+    timer = _Timer()
+    timer('add_data', pairs, _add_pairs, Probabilistic(), F[:pairs],
+          O[:pairs])
+
+    data = Probabilistic()
+    timer('add_data_array', N, data.add_data_array, F, O)
+
+    timer.forecast = data
+    timer('stats', N, data.stats)
+    timer('histogram', N, data.histogram, options['bins'])
+    timer('reliability', N, data.reliability, options['bins'])
+    timer('roc', N, data.roc, options['threshold'])
+    timer('error', N, data.error, options['threshold'])
+    timer('roc_area', N, data.roc_area, threshold=options['threshold'])
+    timer('roc(approx)', N, data.roc, approx=options['approx'])
+    timer('contingency_sweep', N, data.contingency_sweep,
+          numpy.linspace(0.0, 1.0, options['bins']+1))
+
+    # Bootstrap bands replace the binomial ones from here on
+    replicates = options['replicates']
+    timer('bootstrap', N, data.bootstrap, replicates, seed=seed)
+    timer('roc(bootstrap)', N, data.roc, options['bands'])
+
+    stream = Probabilistic(streaming=True)
+    timer('add_data_array(streaming)', N, stream.add_data_array, F, O)
+
+    # End _probabilistic_case(...)
+    return timer.results
+
+#-----------------------------------------------------------------------------#
+
+def _contingency_case(N, seed, options):
+    """Time the contingency table operations.
+
+    This is an internal function and should not be called directly.
+    The rows are split among stations of options['station'] rows
+    each, for the batch scores.
+    """
+    from veripy import ContingencyTable, MultiContingencyTable
+
+    k = 3
+    F, O = categorical_data(N, k, seed=seed)
+
+    timer = _Timer()
+    timer('from_categories(%dx%d)' % (k,k), N,
+          MultiContingencyTable.from_categories, F, O, k)
+
+    table = timer('from_categories(2x2)', N,
+                  ContingencyTable.from_categories, F == 0, O == 0)
+
+    # Tabulate one table per station
+    M = max(N // options['station'], 1)
+    station = numpy.arange(N) * M // N
+    tables = numpy.bincount(station*k*k + F*k + O, minlength=M*k*k)
+
+    timer('batch_stats(%dx%d)' % (k,k), M,
+          MultiContingencyTable.batch_stats, tables.reshape(M, k, k))
+
+    # Collapse each station table to yes (category 0) and no
+    tables = tables.reshape(M, k, k)
+    yesno = numpy.column_stack((tables[:,0,0],
+                                tables[:,0,1:].sum(axis=1),
+                                tables[:,1:,0].sum(axis=1),
+                                tables[:,1:,1:].sum(axis=2).sum(axis=1)))
+
+    timer('batch_stats(2x2)', M, ContingencyTable.batch_stats, yesno)
+    timer('confidence', options['confidence'], table.confidence,
+          options['confidence'], seed=seed)
+
+    # End _contingency_case(...)
+    return timer.results
+
+#-----------------------------------------------------------------------------#
+
+# Benchmark workloads and the functions that time them
+_workloads = {'continuous'    : _continuous_case,
+              'probabilistic' : _probabilistic_case,
+              'contingency'   : _contingency_case}
+
+# Default benchmark options
+_options = {'pairs'      : 10000,
+            'bins'       : 10,
+            'threshold'  : None,
+            'approx'     : 1000,
+            'replicates' : 10,
+            'bands'      : 100,
+            'station'    : 1000,
+            'confidence' : 10000}
+
+###############################################################################
+
+def run_case(workload, N, seed=0, **options):
+    """Time the operations of one workload on one data set.
+
+    Keyword arguments:
+    workload - 'continuous', 'probabilistic' or 'contingency'.
+    N        - Number of forecast/observed pairs.
+    seed     - Seed value for random number generators. (Default 0)
+
+    Further options (with defaults) are pairs (10000), the number of
+    pairs added one at a time with add_data; bins (10), the number of
+    histogram and reliability bins; threshold (None), the curve
+    thresholds; approx (1000), the buckets of an approximate ROC;
+    replicates (10), the number of bootstrap replicates; bands (100),
+    the thresholds of the ROC with bootstrap bands; station
+    (1000), the rows per batched contingency table; and confidence
+    (10000), the number of bootstrap tables for confidence().
+
+    Each operation is timed once, starting from an empty result
+    cache.  Peak memory is that of the whole process so far, so run
+    each case in its own process (as run_suite does) to compare cases.
+
+    Return value:
+    dictionary describing the case, with a list of operation results
+    under 'ops'.
+    """
+    if workload not in _workloads:
+        raise ValueError("'%s' is not a valid workload." % workload)
+
+    settings = dict(_options)
+    settings.update(options)
+
+    results = _workloads[workload](N, seed, settings)
+
+    # End run_case(...)
+    return {'workload' : workload,
+            'rows'     : N,
+            'seed'     : seed,
+            'options'  : settings,
+            'ops'      : results,
+            'peak_rss' : _peak_rss()}
+
+#-----------------------------------------------------------------------------#
+
+def import_time(repeat=5):
+    """Measure the time to import veripy in a fresh interpreter.
+
+    Keyword arguments:
+    repeat - Number of interpreters to start. (Default 5)
+
+    Return values:
+    median import time in seconds,
+    was matplotlib imported along with veripy?
+    """
+    code = ("import sys, timeit\n"
+            "start = timeit.default_timer()\n"
+            "import veripy\n"
+            "print timeit.default_timer() - start\n"
+            "print 'matplotlib' in sys.modules\n")
+
+    times = []
+    for i in xrange(repeat):
+        output = subprocess.check_output([sys.executable, '-c', code],
+                                         env=_environ())
+        seconds, loaded = output.split()
+
+        times.append(float(seconds))
+
+    # End import_time(...)
+    return float(numpy.median(times)), loaded == 'True'
+
+#-----------------------------------------------------------------------------#
+
+def run_suite(filename, workloads=None, sizes=(10**3, 10**4, 10**5, 10**6),
+              seed=0, **options):
+    """Run the benchmark cases and write their results to a JSON file.
+
+    Keyword arguments:
+    filename  - Name of the JSON file to write, or None.
+    workloads - List of workloads to run. (Default None, all of them)
+    sizes     - Data set sizes to run each workload on.
+                (Default 10**3 to 10**6)
+    seed      - Seed value for random number generators. (Default 0)
+
+    Further options are passed to run_case.  Every case runs in a new
+    interpreter (python -m veripy.bench --case), so peak memory is
+    measured per case, and a case that runs out of memory does not
+    stop the others; it is recorded with its error.  Sizes up to 10**8
+    work, given enough memory and time.
+
+    Return value:
+    dictionary of benchmark results.
+    """
+    if workloads is None:
+        workloads = sorted(_workloads)
+
+    seconds, loaded = import_time()
+
+    results = {'python'     : platform.python_version(),
+               'numpy'      : numpy.__version__,
+               'scipy'      : scipy.__version__,
+               'platform'   : platform.platform(),
+               'seed'       : seed,
+               'import'     : {'seconds'    : seconds,
+                               'matplotlib' : loaded},
+               'cases'      : []}
+
+    for workload in workloads:
+        for N in sizes:
+            command = [sys.executable, '-m', 'veripy.bench', '--case',
+                       workload, str(N), '--seed', str(seed),
+                       '--options', json.dumps(options)]
+
+            child = subprocess.Popen(command, stdout=subprocess.PIPE,
+                                     stderr=subprocess.PIPE, env=_environ())
+            output, error = child.communicate()
+
+            if child.returncode == 0:
+                case = json.loads(output)
+            else:
+                case = {'workload' : workload,
+                        'rows'     : N,
+                        'seed'     : seed,
+                        'error'    : error.strip().split('\n')[-1]}
+
+            results['cases'].append(case)
+
+    if filename is not None:
+        with open(filename, 'w') as file:
+            json.dump(results, file, indent=1, sort_keys=True)
+
+    # End run_suite(...)
+    return results
+
+###############################################################################
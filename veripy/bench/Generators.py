@@ -0,0 +1,98 @@
+# Generators.py
+#
+# Copyright (c) James R. Holliday, jrholliday@gmail.com
+# See 'license.txt' for licensing and usage restrictions.
+#
+###############################################################################
+
+"""Seeded synthetic forecast data sets.
+
+This module exports functions that generate forecast/observed arrays
+for benchmarking.  They follow the models of the random-continuous
+and random-probabilistic examples, but draw whole arrays at once from
+a seeded generator, so a given size and seed always gives the same
+data set.
+"""
+
+###############################################################################
+
+from __future__ import division
+
+import numpy
+
+###############################################################################
+
+def continuous_data(N, seed=0):
+    """Generate noisy continuous forecasts.
+
+    Keyword arguments:
+    N    - Number of forecast/observed pairs.
+    seed - Seed value for random number generator. (Default 0)
+
+    Forecasts are uniform over [0.1, 0.9], and each observation is its
+    forecast plus uniform noise over [-0.1, 0.1].
+
+    Return values:
+    array of forecasts,
+    array of observations.
+    """
+    rng = numpy.random.RandomState(seed)
+
+    F = 0.1 + 0.8*rng.random_sample(N)
+    O = F + 0.2*rng.random_sample(N) - 0.1
+
+    # End continuous_data(...)
+    return F, O
+
+#-----------------------------------------------------------------------------#
+
+def probabilistic_data(N, seed=0):
+    """Generate reliable probabilistic forecasts.
+
+    Keyword arguments:
+    N    - Number of forecast/observed pairs.
+    seed - Seed value for random number generator. (Default 0)
+
+    Forecasts are uniform over [0, 1], and each event occurs with the
+    forecast probability.
+
+    Return values:
+    array of forecasts,
+    array of observed events (0 or 1).
+    """
+    rng = numpy.random.RandomState(seed)
+
+    F = rng.random_sample(N)
+    O = (rng.random_sample(N) < F).astype(int)
+
+    # End probabilistic_data(...)
+    return F, O
+
+#-----------------------------------------------------------------------------#
+
+def categorical_data(N, k=3, skill=0.6, seed=0):
+    """Generate multi-category forecasts.
+
+    Keyword arguments:
+    N     - Number of forecast/observed pairs.
+    k     - Number of categories. (Default 3)
+    skill - Chance that a forecast names the observed category.
+            (Default 0.6)
+    seed  - Seed value for random number generator. (Default 0)
+
+    Observed categories are uniform over 0 to k-1.  Forecasts that do
+    not name the observed category are uniform over all categories.
+
+    Return values:
+    array of forecast categories,
+    array of observed categories.
+    """
+    rng = numpy.random.RandomState(seed)
+
+    O = rng.randint(0, k, N)
+    F = numpy.where(rng.random_sample(N) < skill, O, rng.randint(0, k, N))
+
+    # End categorical_data(...)
+    return F, O
+
+###############################################################################
@@ -0,0 +1,635 @@
+# Golden.py
+#
+# Copyright (c) James R. Holliday, jrholliday@gmail.com
+# See 'license.txt' for licensing and usage restrictions.
+#
+###############################################################################
+
+"""Golden-output checks on the bundled example data sets.
+
+This module exports the record and check functions.  record saves the
+outputs of the reference code path, which adds the data pairs one at
+a time with add_data, on the NSHM-21.dat and POP_3cat_2003.txt
+examples.  Given a checkout of the original code, it takes the
+outputs that code can give from there instead.  check recomputes the
+same outputs through every other code path (bulk arrays,
+memory-mapped files, streaming, lazy and parallel bootstrap) and
+compares them with the saved ones, timing each output.
+
+The golden.json next to this module was recorded with
+
+    git worktree add /tmp/baseline a50ac4c
+    python -m veripy.bench --golden record --baseline /tmp/baseline
+"""
+
+###############################################################################
+
+from __future__ import division
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import timeit
+
+from Benchmarks import _environ
+
+import numpy
+
+###############################################################################
+
+_here = os.path.dirname(os.path.abspath(__file__))
+
+# Default location of the saved outputs
+GOLDEN = os.path.join(_here, 'golden.json')
+
+# Default location of the example data sets
+EXAMPLES = os.path.join(os.path.dirname(os.path.dirname(_here)), 'Examples')
+
+# Example data sets: file name, columns and missing value
+_datasets = {'NSHM-21'  : ('NSHM-21.dat', [2, 3], None),
+             'POP-24h'  : ('POP_3cat_2003.txt',
+                           ['p24_cat1 + p24_cat2', 'obs > 0'], -999),
+             'POP-48h'  : ('POP_3cat_2003.txt',
+                           ['p48_cat1 + p48_cat2', 'obs > 0'], -999)}
+
+# Thresholds given as a list, and as numbers of thresholds
+_thresholds = [0.0, 0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 0.75, 1.0]
+_sweep = numpy.linspace(0.0, 1.0, 11)
+
+# Outputs, computed in this order.  An output with keywords instead of
+# a function draws a new bootstrap, and the outputs after it use its
+# confidence bands.
+_outputs = [('stats',                 lambda f: f.stats()),
+            ('histogram',             lambda f: f.histogram(10)),
+            ('histogram(unit=True)',  lambda f: f.histogram(10, unit=True)),
+            ('histogram(unit=False)', lambda f: f.histogram(10, unit=False)),
+            ('reliability',           lambda f: f.reliability()),
+            ('roc',                   lambda f: f.roc(10)),
+            ('roc(None)',             lambda f: f.roc()),
+            ('roc(unit=False)',       lambda f: f.roc(10, unit=False)),
+            ('roc(list)',             lambda f: f.roc(_thresholds)),
+            ('roc(approx)',           lambda f: f.roc(approx=20)),
+            ('roc(approx,unit=False)',
+             lambda f: f.roc(approx=20, unit=False)),
+            ('error',                 lambda f: f.error(10)),
+            ('error(None)',           lambda f: f.error()),
+            ('error(unit=False)',     lambda f: f.error(10, unit=False)),
+            ('error(list)',           lambda f: f.error(_thresholds)),
+            ('error(approx)',         lambda f: f.error(approx=20)),
+            ('roc_area',              lambda f: f.roc_area(threshold=10)),
+            ('roc_area(None)',        lambda f: f.roc_area()),
+            ('error_area',            lambda f: f.error_area(threshold=10)),
+            ('error_area(None)',      lambda f: f.error_area()),
+            ('approx_bound',          lambda f: f.approx_bound(20)),
+            ('approx_bound(ERROR)',
+             lambda f: f.approx_bound(20, curve='ERROR')),
+            ('auc',                   lambda f: f.auc()),
+            ('auc(weighted)',         lambda f: f.auc(weighted=True)),
+            ('contingency_sweep',     lambda f: f.contingency_sweep(_sweep)),
+            ('bootstrap',             {}),
+            ('roc(bootstrap)',        lambda f: f.roc(10)),
+            ('error(bootstrap)',      lambda f: f.error(10)),
+            ('roc_area(bootstrap)',   lambda f: f.roc_area(threshold=10)),
+            ('bootstrap(cdf)',        {'method' : 'cdf'}),
+            ('roc(cdf)',              lambda f: f.roc(10)),
+            ('error(cdf)',            lambda f: f.error(10)),
+            ('bootstrap(alias)',      {'method' : 'alias'}),
+            ('roc(alias)',            lambda f: f.roc(10)),
+            ('error(alias)',          lambda f: f.error(10))]
+
+# Outputs computed before any bootstrap that the original code
+# cannot give, so that record takes them from the current code even
+# when it is given the original code
+_added = set(['roc(approx)', 'roc(approx,unit=False)', 'error(approx)',
+              'approx_bound', 'approx_bound(ERROR)', 'auc', 'auc(weighted)',
+              'contingency_sweep'])
+
+###############################################################################
+
+def _plain(value):
+    """Turn an output into plain lists, dictionaries and numbers.
+
+    This is an internal function and should not be called directly.
+    Dictionaries with number keys (such as histograms) become sorted
+    lists of [key, value] pairs.
+    """
+    if isinstance(value, dict):
+        if all( isinstance(key, basestring) for key in value ):
+            plain = dict( (key, _plain(item)) for key,item in value.items() )
+        else:
+            plain = [ [_plain(key), _plain(value[key])]
+                      for key in sorted(value) ]
+
+    elif isinstance(value, (list, tuple, numpy.ndarray)):
+        plain = [ _plain(item) for item in value ]
+
+    elif isinstance(value, numpy.generic):
+        plain = value.item()
+
+    else:
+        plain = value
+
+    # End _plain(...)
+    return plain
+
+#-----------------------------------------------------------------------------#
+
+def _difference(reference, value):
+    """Return the largest difference between two plain outputs.
+
+    This is an internal function and should not be called directly.
+    Numbers are compared by relative difference (absolute, for
+    numbers below 1), and NaN only matches NaN.  Keys missing from
+    value, or a different structure, give an infinite difference.
+    Keys of value that are not in reference are ignored.
+    """
+    number = (int, long, float)
+
+    if isinstance(reference, dict):
+        if isinstance(value, dict) and \
+           all( key in value for key in reference ):
+            diff = max([ _difference(reference[key], value[key])
+                         for key in reference ] + [0.0])
+        else:
+            diff = numpy.inf
+
+    elif isinstance(reference, list):
+        if isinstance(value, list) and len(reference) == len(value):
+            diff = max([ _difference(a, b)
+                         for a,b in zip(reference, value) ] + [0.0])
+        else:
+            diff = numpy.inf
+
+    elif not isinstance(reference, number) or \
+         not isinstance(value, number):
+        diff = 0.0 if reference == value else numpy.inf
+
+    elif reference != reference or value != value:
+        # NaN only matches NaN
+        diff = 0.0 if reference != reference and value != value \
+               else numpy.inf
+
+    elif reference == value:
+        diff = 0.0
+
+    else:
+        diff = abs(reference - value) / max(1.0, abs(reference))
+
+    # End _difference(...)
+    return diff
+
+###############################################################################
+
+def _load(name, path):
+    """Read the forecasts and observations of an example data set.
+
+    This is an internal function and should not be called directly.
+    """
+    from veripy.tools import read_table
+
+    filename, columns, missing = _datasets[name]
+
+    # End _load(...)
+    return read_table(os.path.join(path, filename), columns,
+                      missing=missing)
+
+#-----------------------------------------------------------------------------#
+
+def _pairs(F, O):
+    """Build a forecast from single data pairs (the reference path).
+
+    This is an internal function and should not be called directly.
+    """
+    from veripy import Probabilistic
+
+    forecast = Probabilistic()
+    for f,o in zip(F.tolist(), O.tolist()):
+        forecast.add_data(f, int(o))
+
+    # End _pairs(...)
+    return forecast
+
+#-----------------------------------------------------------------------------#
+
+def _arrays(F, O):
+    """Build a forecast from whole arrays.
+
+    This is an internal function and should not be called directly.
+    """
+    from veripy import Probabilistic
+
+    # End _arrays(...)
+    return Probabilistic.from_arrays(F, O)
+
+#-----------------------------------------------------------------------------#
+
+def _streaming(F, O):
+    """Build a streaming forecast, which keeps no data pairs.
+
+    This is an internal function and should not be called directly.
+    """
+    from veripy import Probabilistic
+
+    # End _streaming(...)
+    return Probabilistic.from_arrays(F, O, streaming=True)
+
+#-----------------------------------------------------------------------------#
+
+def _memmap(F, O):
+    """Build a forecast over a memory-mapped copy of the data.
+
+    This is an internal function and should not be called directly.
+    The file is read in small chunks so that the chunked code paths
+    see more than one chunk.
+    """
+    from veripy import Probabilistic
+
+    dtype = [('prob', 'f8'), ('count', 'i8')]
+
+    records = numpy.zeros(len(F), dtype=dtype)
+    records['prob'] = F
+    records['count'] = O
+
+    handle, filename = tempfile.mkstemp(suffix='.bin')
+    os.close(handle)
+    records.tofile(filename)
+
+    forecast = Probabilistic.from_memmap(filename, dtype, chunksize=1000)
+
+    # The mapping keeps the data readable after the name is gone
+    if os.name == 'posix':
+        os.remove(filename)
+
+    # End _memmap(...)
+    return forecast
+
+#-----------------------------------------------------------------------------#
+
+# Code paths: forecast builder and bootstrap keywords (None where the
+# path cannot bootstrap).  The first path is the reference.
+_paths = [('add_data',    _pairs,     {}),
+          ('from_arrays', _arrays,    {}),
+          ('lazy',        _arrays,    {'lazy' : True}),
+          ('workers',     _arrays,    {'workers' : 2}),
+          ('memmap',      _memmap,    None),
+          ('streaming',   _streaming, None)]
+
+###############################################################################
+
+# Pairs of calls whose memoized results must not be mixed up: the
+# arguments compare equal but select different code paths
+_cache_pairs = [(lambda f: f.roc(10, unit=True), lambda f: f.roc(10, unit=1)),
+                (lambda f: f.roc(10, unit=1), lambda f: f.roc(10, unit=True)),
+                (lambda f: f.error(10, unit=True),
+                 lambda f: f.error(10, unit=1)),
+                (lambda f: f.histogram(10, unit=True),
+                 lambda f: f.histogram(10, unit=1))]
+
+#-----------------------------------------------------------------------------#
+
+def _cache_order(F, O):
+    """Check that memoized results do not depend on the call order.
+
+    This is an internal function and should not be called directly.
+    The second call of each pair is made on a fresh forecast, and
+    again right after the first call.
+
+    Return value:
+    largest difference between the two results.
+    """
+    worst = 0.0
+
+    for first, second in _cache_pairs:
+        expected = _plain(second(_arrays(F, O)))
+
+        forecast = _arrays(F, O)
+        first(forecast)
+
+        worst = max(worst, _difference(expected, _plain(second(forecast))))
+
+    # End _cache_order(...)
+    return worst
+
+#-----------------------------------------------------------------------------#
+
+def _auc_area(F, O):
+    """Check the exact ROC area against the trapezoid area of the curve.
+
+    This is an internal function and should not be called directly.
+    auc() must equal the area of the ROC curve traced through every
+    distinct forecast value.
+
+    Return value:
+    difference between the two areas.
+    """
+    forecast = _arrays(F, O)
+
+    area = forecast.auc()[0]
+    curve = forecast.roc_area(threshold=numpy.unique(F))[1][-1]
+
+    # End _auc_area(...)
+    return _difference(curve, area)
+
+#-----------------------------------------------------------------------------#
+
+# Names offered at the top level of veripy since its first release
+_exports = ['ContingencyTable', 'MultiContingencyTable', 'Probabilistic',
+            'Continuous', 'tools', 'CI', 'ConfidenceIntervals', 'GenericCDF']
+
+def _import_check():
+    """Check what a plain "import veripy" provides and imports.
+
+    This is an internal function and should not be called directly.
+    veripy is imported in a fresh interpreter that notes every
+    attempt to import matplotlib, whether or not it is installed.
+
+    Return value:
+    list of problems found (empty if there are none).
+    """
+    code = ("import sys\n"
+            "class Finder(object):\n"
+            "    tried = []\n"
+            "    def find_module(self, name, path=None):\n"
+            "        if name.split('.')[0] == 'matplotlib':\n"
+            "            self.tried.append(name)\n"
+            "sys.meta_path.insert(0, Finder())\n"
+            "import veripy\n"
+            "for name in Finder.tried[:1]:\n"
+            "    print 'imports', name\n"
+            "for name in sys.argv[1:]:\n"
+            "    if not hasattr(veripy, name):\n"
+            "        print 'lacks', name\n")
+
+    output = subprocess.check_output([sys.executable, '-c', code] +
+                                     _exports, env=_environ())
+
+    # End _import_check()
+    return output.splitlines()
+
+#-----------------------------------------------------------------------------#
+
+# Consistency checks run on each data set: name and function of the
+# data, returning the largest difference found
+_invariants = [('cache order', _cache_order),
+               ('auc area',    _auc_area)]
+
+###############################################################################
+
+def _run(path, F, O, seed, replicates):
+    """Compute and time the outputs of one code path.
+
+    This is an internal function and should not be called directly.
+
+    Return value:
+    list of (output, plain value, seconds, error) tuples.  For outputs
+    that the code path cannot compute, the value is None and error is
+    the reason.
+    """
+    name, build, options = path
+
+    start = timeit.default_timer()
+    forecast = build(F, O)
+    results = [ ('build', None, timeit.default_timer() - start, None) ]
+
+    for output, function in _outputs:
+        bootstrap = isinstance(function, dict)
+
+        if bootstrap and options is None:
+            break
+
+        start = timeit.default_timer()
+        value, error = None, None
+
+        try:
+            if bootstrap:
+                keywords = dict(options, **function)
+                forecast.bootstrap(replicates, seed=seed, **keywords)
+            else:
+                value = _plain(function(forecast))
+
+        # Code paths without the data pairs refuse some outputs
+        except Exception as e:
+            if 'needs the data pairs' not in str(e):
+                raise
+            error = str(e)
+
+        results.append( (output, value, timeit.default_timer() - start,
+                         error) )
+
+    # End _run(...)
+    return results
+
+#-----------------------------------------------------------------------------#
+
+def _baseline_outputs(datafile):
+    """Compute the outputs that the original code can give.
+
+    This is an internal function and should not be called directly.
+    It runs in an interpreter that imports the original veripy (see
+    _from_baseline), on the data pairs saved in datafile.
+
+    Return value:
+    dictionary of plain outputs indexed by output.
+    """
+    data = numpy.load(datafile)
+
+    forecast = _pairs(data['F'], data['O'])
+
+    outputs = {}
+
+    for output, function in _outputs:
+        if isinstance(function, dict):
+            break
+
+        if output not in _added:
+            outputs[output] = _plain(function(forecast))
+
+    # End _baseline_outputs(...)
+    return outputs
+
+#-----------------------------------------------------------------------------#
+
+def _from_baseline(root, F, O):
+    """Compute the reference outputs with the original code.
+
+    This is an internal function and should not be called directly.
+    root is a directory holding the original veripy package, such as
+    a checkout of the first release.  A new interpreter imports veripy
+    from there, and only this module from the current tree.
+
+    Return value:
+    dictionary of plain outputs indexed by output.
+    """
+    handle, datafile = tempfile.mkstemp(suffix='.npz')
+    os.close(handle)
+
+    numpy.savez(datafile, F=F, O=O)
+
+    code = ("import imp, json, sys\n"
+            "sys.path.insert(0, sys.argv[1])\n"
+            "golden = imp.load_source('Golden', sys.argv[2])\n"
+            "print json.dumps(golden._baseline_outputs(sys.argv[3]))\n")
+
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.path.abspath(root)
+
+    # Run from root, so that no other veripy comes first on the path
+    try:
+        output = subprocess.check_output([sys.executable, '-c', code, _here,
+                                          os.path.join(_here, 'Golden.py'),
+                                          datafile],
+                                         cwd=root, env=env)
+    finally:
+        os.remove(datafile)
+
+    # End _from_baseline(...)
+    return json.loads(output)
+
+#-----------------------------------------------------------------------------#
+
+def record(filename=GOLDEN, path=EXAMPLES, seed=0, replicates=100,
+           baseline=None):
+    """Save the reference outputs on the example data sets.
+
+    Keyword arguments:
+    filename   - JSON file to write. (Default golden.json, next to this
+                 module)
+    path       - Directory holding the example data sets.
+                 (Default the Examples directory of the source tree)
+    seed       - Seed value for the bootstrap. (Default 0)
+    replicates - Number of bootstrap replicates. (Default 100)
+    baseline   - Directory holding the original veripy package.
+                 (Default None)
+
+    The outputs come from the reference code path of the current
+    code.  If baseline is given, the outputs that do not depend on
+    the bootstrap and that the original code can give are taken from
+    the original code instead, so that check compares the current
+    code with it.  Where such an output is a dictionary (stats), the
+    keys that only the current code gives are kept.  The source of
+    each output, 'baseline' or 'current', is saved along with it.
+
+    Return value:
+    dictionary of outputs indexed by data set and output.
+    """
+    golden = {'seed'       : seed,
+              'replicates' : replicates,
+              'outputs'    : {},
+              'sources'    : {}}
+
+    for name in sorted(_datasets):
+        F, O = _load(name, path)
+
+        outputs = dict( (output, value)
+                        for output,value,seconds,error
+                        in _run(_paths[0], F, O, seed, replicates)
+                        if value is not None )
+
+        sources = dict( (output, 'current') for output in outputs )
+
+        if baseline is not None:
+            for output, value in _from_baseline(baseline, F, O).items():
+                if isinstance(value, dict):
+                    value = dict(outputs.get(output, {}), **value)
+
+                outputs[output] = value
+                sources[output] = 'baseline'
+
+        golden['outputs'][name] = outputs
+        golden['sources'][name] = sources
+
+    with open(filename, 'w') as file:
+        json.dump(golden, file, indent=1, sort_keys=True)
+
+    # End record(...)
+    return golden
+
+#-----------------------------------------------------------------------------#
+
+def check(filename=GOLDEN, path=EXAMPLES, tolerance=1e-9):
+    """Compare every code path with the saved reference outputs.
+
+    Keyword arguments:
+    filename  - JSON file written by record. (Default golden.json)
+    path      - Directory holding the example data sets.
+                (Default the Examples directory of the source tree)
+    tolerance - Largest relative difference allowed. (Default 1e-9)
+
+    Outputs that a code path does not support (such as reliability
+    for streaming forecasts) are reported as skipped.  The bootstrap
+    uses the saved seed, so the outputs with bootstrap bands must
+    match as well.  Consistency checks that need no saved outputs
+    (such as the independence of memoized results from the call
+    order) are reported under the 'invariant' path, as is the check
+    that importing veripy offers the usual names without importing
+    matplotlib (with the problems found, if any).
+
+    Return value:
+    list of dictionaries, one per data set, code path and output,
+    with the source of the reference output, the largest
+    difference, whether it is within tolerance (None if there is
+    nothing to compare), the reason for skipping and the wall time in
+    seconds.
+    """
+    with open(filename) as file:
+        golden = json.load(file)
+
+    checks = []
+
+    start = timeit.default_timer()
+    problems = _import_check()
+
+    checks.append({'dataset'    : 'veripy',
+                   'path'       : 'invariant',
+                   'output'     : 'import',
+                   'difference' : None,
+                   'ok'         : not problems,
+                   'skipped'    : None,
+                   'problems'   : problems,
+                   'seconds'    : timeit.default_timer() - start})
+
+    for name in sorted(golden['outputs']):
+        F, O = _load(name, path)
+        reference = golden['outputs'][name]
+        sources = golden.get('sources', {}).get(name, {})
+
+        for code in _paths:
+            for output,value,seconds,error in _run(code, F, O,
+                                                   golden['seed'],
+                                                   golden['replicates']):
+                if value is None:
+                    difference, ok = None, None
+                elif output not in reference:
+                    difference, ok = None, None
+                    error = 'not in the reference outputs'
+                else:
+                    difference = _difference(reference[output], value)
+                    ok = bool(difference <= tolerance)
+
+                checks.append({'dataset'    : name,
+                               'path'       : code[0],
+                               'output'     : output,
+                               'source'     : sources.get(output),
+                               'difference' : difference,
+                               'ok'         : ok,
+                               'skipped'    : error,
+                               'seconds'    : seconds})
+
+        for output, function in _invariants:
+            start = timeit.default_timer()
+            difference = function(F, O)
+
+            checks.append({'dataset'    : name,
+                           'path'       : 'invariant',
+                           'output'     : output,
+                           'difference' : difference,
+                           'ok'         : bool(difference <= tolerance),
+                           'skipped'    : None,
+                           'seconds'    : timeit.default_timer() - start})
+
+    # End check(...)
+    return checks
+
+###############################################################################
@@ -0,0 +1,34 @@
+# __init.py__
+#
+# Copyright (c) James R. Holliday, jrholliday@gmail.com
+# See 'license.txt' for licensing and usage restrictions.
+#
+###############################################################################
+
+"""Benchmarks for the VeriPy package.
+
+Run the benchmark suite from the command line with:
+    python -m veripy.bench --output results.json
+
+See 'python -m veripy.bench --help' for the workloads, sizes and
+other options.  The Golden module checks every code path against
+saved outputs on the example data sets:
+    python -m veripy.bench --golden check
+"""
+
+###############################################################################
+
+from Generators import continuous_data, probabilistic_data, categorical_data
+from Benchmarks import run_case, run_suite, import_time
+
+import Golden
+
+__all__ = ['Golden',
+           'continuous_data',
+           'probabilistic_data',
+           'categorical_data',
+           'run_case',
+           'run_suite',
+           'import_time']
+
+###############################################################################
@@ -0,0 +1,165 @@
+# __main__.py
+#
+# Copyright (c) James R. Holliday, jrholliday@gmail.com
+# See 'license.txt' for licensing and usage restrictions.
+#
+###############################################################################
+
+"""Command line interface to the VeriPy benchmarks.
+
+Sample usage:
+    python -m veripy.bench --output results.json
+    python -m veripy.bench --workloads probabilistic --sizes 1e3 1e5 1e7
+    python -m veripy.bench --golden check --output golden-check.json
+    python -m veripy.bench --golden record --baseline /tmp/baseline
+"""
+
+###############################################################################
+
+import argparse
+import json
+import sys
+
+from veripy.bench.Benchmarks import run_case, run_suite, _workloads
+from veripy.bench import Golden
+
+###############################################################################
+
+def size(text):
+    """Read a data set size, such as '1000' or '1e6'."""
+
+    # End size(...)
+    return int(float(text))
+
+#-----------------------------------------------------------------------------#
+
+def main():
+    """Run the benchmarks given on the command line."""
+
+    parser = argparse.ArgumentParser(prog='python -m veripy.bench',
+                                     description='Time VeriPy operations '
+                                     'on seeded synthetic data sets.')
+
+    parser.add_argument('--output', default='bench.json',
+                        help='JSON file for the results (default %(default)s)')
+    parser.add_argument('--workloads', nargs='+', choices=sorted(_workloads),
+                        help='workloads to run (default all)')
+    parser.add_argument('--sizes', nargs='+', type=size,
+                        default=[10**3, 10**4, 10**5, 10**6],
+                        help='data set sizes (default 1e3 to 1e6)')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='random number seed (default %(default)s)')
+
+    parser.add_argument('--pairs', type=size,
+                        help='pairs added one at a time with add_data')
+    parser.add_argument('--bins', type=int,
+                        help='histogram and reliability bins')
+    parser.add_argument('--threshold', type=int,
+                        help='number of curve thresholds (default exact)')
+    parser.add_argument('--approx', type=int,
+                        help='buckets of the approximate ROC')
+    parser.add_argument('--replicates', type=int,
+                        help='bootstrap replicates')
+    parser.add_argument('--bands', type=int,
+                        help='thresholds of the ROC with bootstrap bands')
+    parser.add_argument('--station', type=size,
+                        help='rows per batched contingency table')
+    parser.add_argument('--confidence', type=size,
+                        help='bootstrap tables for confidence()')
+
+    parser.add_argument('--golden', choices=('record', 'check'),
+                        help='record the reference outputs on the example '
+                        'data sets, or check every code path against them')
+    parser.add_argument('--reference', default=Golden.GOLDEN,
+                        help='file of reference outputs (default the '
+                        'golden.json of veripy.bench)')
+    parser.add_argument('--baseline', metavar='DIR',
+                        help='directory holding the original veripy '
+                        'package, to take the reference outputs from with '
+                        '--golden record')
+    parser.add_argument('--examples', default=Golden.EXAMPLES,
+                        help='directory holding the example data sets')
+    parser.add_argument('--tolerance', type=float, default=1e-9,
+                        help='largest relative difference allowed by '
+                        '--golden check (default %(default)s)')
+
+    # Used by run_suite to run a single case in a new interpreter
+    parser.add_argument('--case', nargs=2, metavar=('WORKLOAD', 'N'),
+                        help=argparse.SUPPRESS)
+    parser.add_argument('--options', default='{}', help=argparse.SUPPRESS)
+
+    args = parser.parse_args()
+
+    if args.case is not None:
+        options = json.loads(args.options)
+        print json.dumps(run_case(args.case[0], size(args.case[1]),
+                                  args.seed, **options))
+        return None
+
+    if args.golden == 'record':
+        Golden.record(args.reference, args.examples,
+                      baseline=args.baseline)
+        print "Reference outputs written to %s" % args.reference
+        return None
+
+    if args.golden == 'check':
+        checks = Golden.check(args.reference, args.examples, args.tolerance)
+
+        with open(args.output, 'w') as file:
+            json.dump({'golden' : checks}, file, indent=1, sort_keys=True)
+
+        for check in checks:
+            if check['ok'] is not None:
+                status = 'ok' if check['ok'] else 'FAILED'
+            elif check['skipped'] is not None:
+                status = 'skipped'
+            else:
+                status = ''
+
+            print "%-8s %-12s %-22s %-8s %10.4f s" % (check['dataset'],
+                  check['path'], check['output'], status, check['seconds'])
+
+            for problem in check.get('problems', ()):
+                print "    %s" % problem
+
+        # Fail the run if any output has changed
+        if any( check['ok'] is False for check in checks ):
+            sys.exit(1)
+
+        return None
+
+    options = {}
+    for name in ('pairs', 'bins', 'threshold', 'approx', 'replicates',
+                 'bands', 'station', 'confidence'):
+        if getattr(args, name) is not None:
+            options[name] = getattr(args, name)
+
+    results = run_suite(args.output, args.workloads, args.sizes, args.seed,
+                        **options)
+
+    # Summarize the results
+    print "import veripy: %.3f s (matplotlib loaded: %s)" % (
+        results['import']['seconds'], results['import']['matplotlib'])
+
+    for case in results['cases']:
+        print
+        print "%s, %d rows" % (case['workload'], case['rows'])
+
+        if 'error' in case:
+            print "    failed: %s" % case['error']
+            continue
+
+        for op in case['ops']:
+            print "    %-28s %10.4f s" % (op['op'], op['seconds'])
+
+        if case['peak_rss'] is not None:
+            print "    %-28s %10.1f MB" % ('peak memory',
+                                          case['peak_rss'] / 2.0**20)
+
+    # End main()
+    return None
+
+###############################################################################
+
+if __name__ == '__main__':
+    main()
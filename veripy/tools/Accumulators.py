@@ -0,0 +1,422 @@
+# Accumulators.py
+#
+# Copyright (c) James R. Holliday, jrholliday@gmail.com
+# See 'license.txt' for licensing and usage restrictions.
+#
+###############################################################################
+
+"""Streaming accumulators for forecast verification scores.
+
+This module exports accumulator classes that keep running sufficient
+statistics instead of raw forecast/observed pairs.  Data can be added
+one pair at a time, or as arrays, and accumulators built on different
+shards or processes can be merged exactly.
+"""
+
+###############################################################################
+
+from __future__ import division
+
+from bisect import bisect_left
+
+from Binning import bin_index
+
+import numpy
+
+###############################################################################
+
+class ContinuousAccumulator(object):
+    """
+    This class keeps running sums for the Continuous forecast scores
+    (ME, BIAS, MAE, MSE, RMSE and R).  Means, variances and the
+    forecast/observed co-moment are updated with Welford's method,
+    and partial results are combined with the pairwise formulas of
+    Chan, Golub and LeVeque.  Each update costs O(1).
+
+    Sample usage:
+        acc = ContinuousAccumulator()
+        acc.update(forecast, observed)
+        acc.update_array(F, O)
+        acc.merge(other)
+        acc.stats()
+    """
+
+    #-------------------------------------------------------------------------#
+
+    def __init__(self):
+        """Initialize ContinuousAccumulator object."""
+
+        # Number of data pairs
+        self.N = 0
+
+        # Running sums
+        self._sumF  = 0.0
+        self._sumO  = 0.0
+        self._sumE  = 0.0
+        self._sumAE = 0.0
+        self._sumSE = 0.0
+
+        # Running means, squared deviations and co-moment
+        self._meanF = 0.0
+        self._meanO = 0.0
+        self._M2F   = 0.0
+        self._M2O   = 0.0
+        self._C     = 0.0
+
+    #-------------------------------------------------------------------------#
+
+    def update(self, forecast, observed):
+        """Add a forecast/observed data pair.
+
+        Return value:
+        None
+        """
+        error = forecast - observed
+
+        self.N += 1
+
+        self._sumF  += forecast
+        self._sumO  += observed
+        self._sumE  += error
+        self._sumAE += abs(error)
+        self._sumSE += error*error
+
+        # Welford updates
+        dF = forecast - self._meanF
+        dO = observed - self._meanO
+
+        self._meanF += dF / self.N
+        self._meanO += dO / self.N
+
+        self._M2F += dF * (forecast - self._meanF)
+        self._M2O += dO * (observed - self._meanO)
+        self._C   += dF * (observed - self._meanO)
+
+        # End update(self, ...)
+        return None
+
+    #-------------------------------------------------------------------------#
+
+    def update_array(self, forecast, observed):
+        """Add arrays of forecast/observed data pairs.
+
+        Return value:
+        None
+        """
+        F = numpy.asarray(forecast, dtype=float).ravel()
+        O = numpy.asarray(observed, dtype=float).ravel()
+
+        if len(F) != len(O):
+            raise ValueError("Forecast and observed arrays differ in "
+                             "length (%d!=%d)." % (len(F), len(O)))
+
+        if len(F) == 0:
+            return None
+
+        # Summarize the arrays, then merge them in
+        batch = ContinuousAccumulator()
+
+        batch.N = len(F)
+
+        E = F - O
+
+        batch._sumF  = F.sum()
+        batch._sumO  = O.sum()
+        batch._sumE  = E.sum()
+        batch._sumAE = abs(E).sum()
+        batch._sumSE = (E*E).sum()
+
+        batch._meanF = F.mean()
+        batch._meanO = O.mean()
+        batch._M2F   = ((F - batch._meanF)**2).sum()
+        batch._M2O   = ((O - batch._meanO)**2).sum()
+        batch._C     = ((F - batch._meanF)*(O - batch._meanO)).sum()
+
+        self.merge(batch)
+
+        # End update_array(self, ...)
+        return None
+
+    #-------------------------------------------------------------------------#
+
+    def merge(self, other):
+        """Combine the data summarized by another accumulator.
+
+        Return value:
+        None
+        """
+        if other.N == 0:
+            return None
+
+        nA = self.N
+        nB = other.N
+        N  = nA + nB
+
+        dF = other._meanF - self._meanF
+        dO = other._meanO - self._meanO
+
+        self._sumF  += other._sumF
+        self._sumO  += other._sumO
+        self._sumE  += other._sumE
+        self._sumAE += other._sumAE
+        self._sumSE += other._sumSE
+
+        self._meanF += dF * nB / N
+        self._meanO += dO * nB / N
+
+        self._M2F += other._M2F + dF * dF * nA * nB / N
+        self._M2O += other._M2O + dO * dO * nA * nB / N
+        self._C   += other._C   + dF * dO * nA * nB / N
+
+        self.N = N
+
+        # End merge(self, ...)
+        return None
+
+    #-------------------------------------------------------------------------#
+
+    def stats(self):
+        """Return the forecast statistics of the accumulated data.
+
+        Return value:
+        dictionary of test results indexed by test.
+        """
+        results = {}
+
+        N = numpy.float64(self.N)
+
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            # Calculate the "Mean Error"
+            results['ME'] = self._sumE / N
+
+            # Calculate the (multiplicative) "Bias"
+            results['BIAS'] = numpy.float64(self._sumF) / self._sumO
+
+            # Calculate the "Mean Absolute Error"
+            results['MAE'] = self._sumAE / N
+
+            # Calculate the "Mean Square Error"
+            results['MSE'] = self._sumSE / N
+
+            # Calculate the "Root Mean Square Error"
+            results['RMSE'] = numpy.sqrt(results['MSE'])
+
+            # Calculate the "Correlation Coefficient" (R)
+            results['R'] = numpy.float64(self._C) / numpy.sqrt(self._M2F *
+                                                         self._M2O)
+
+        # End stats(self)
+        return results
+
+###############################################################################
+
+class BrierAccumulator(object):
+    """
+    This class keeps binned sums for the Brier score of probabilistic
+    forecasts.  Each forecast bin holds the sum of its forecasts, the
+    sum of its observed events and its number of samples.  These give
+    the Brier score (BS), the Brier skill score (BSS) and Murphy's
+    reliability/resolution/uncertainty (REL, RES, UNC) decomposition
+    in O(bins), without storing the data pairs.
+
+    Forecasts are sorted into bins with the same rules as
+    Forecast.histogram.  BS and BSS are exact.  The decomposition uses
+    the mean forecast of each bin, so BS = REL - RES + UNC only holds
+    exactly when every bin contains a single forecast value.
+
+    Sample usage:
+        acc = BrierAccumulator(bins=10)
+        acc.update(forecast, observed)
+        acc.update_array(F, O)
+        acc.merge(other)
+        acc.stats()
+    """
+
+    #-------------------------------------------------------------------------#
+
+    def __init__(self, bins=10):
+        """Initialize BrierAccumulator object.
+
+        Keyword arguments:
+        bins -- number or description of bins to populate. (default 10)
+
+        The bins keyword can either be an integer, N, or a list of
+        upper edges.  Since a stream has no known range, N bins are
+        constructed with uniform width over [0,1].
+        """
+
+        if type(bins) is int:
+            bins = numpy.linspace(0.0, 1.0, bins+1)
+
+        self.edges = numpy.asarray(bins, dtype=float)
+
+        # Running maximum of the upper edges, for single updates
+        self._upper = numpy.maximum.accumulate(self.edges[1:]).tolist()
+
+        # Number of data pairs
+        self.N = 0
+
+        # Running sums over all data pairs
+        self._sumSE = 0.0
+        self._sumF  = 0.0
+        self._sumF2 = 0.0
+        self._sumO  = 0.0
+        self._sumO2 = 0.0
+
+        # Per-bin sums (underflow, bins, overflow, no bin)
+        Nbins = len(self.edges) + 2
+        self._binF = numpy.zeros(Nbins)
+        self._binO = numpy.zeros(Nbins)
+        self._binN = numpy.zeros(Nbins, dtype=numpy.int64)
+
+    #-------------------------------------------------------------------------#
+
+    def _index(self, forecast):
+        """Find the bin of a single forecast.
+
+        This is an internal function and should not be called directly.
+        It agrees with bin_index.
+        """
+        Nedges = len(self.edges)
+
+        if forecast != forecast:
+            index = Nedges + 1
+        elif forecast < self.edges[0]:
+            index = 0
+        elif forecast > self.edges[-1]:
+            index = Nedges
+        else:
+            index = 1 + bisect_left(self._upper, forecast)
+            if index == Nedges:
+                index = Nedges + 1
+
+        # End _index(self, ...)
+        return index
+
+    #-------------------------------------------------------------------------#
+
+    def update(self, forecast, observed):
+        """Add a forecast/observed data pair.
+
+        Return value:
+        None
+        """
+        error = forecast - observed
+
+        self.N += 1
+
+        self._sumSE += error*error
+        self._sumF  += forecast
+        self._sumF2 += forecast*forecast
+        self._sumO  += observed
+        self._sumO2 += observed*observed
+
+        index = self._index(forecast)
+
+        self._binF[index] += forecast
+        self._binO[index] += observed
+        self._binN[index] += 1
+
+        # End update(self, ...)
+        return None
+
+    #-------------------------------------------------------------------------#
+
+    def update_array(self, forecast, observed):
+        """Add arrays of forecast/observed data pairs.
+
+        Return value:
+        None
+        """
+        F = numpy.asarray(forecast, dtype=float).ravel()
+        O = numpy.asarray(observed, dtype=float).ravel()
+
+        if len(F) != len(O):
+            raise ValueError("Forecast and observed arrays differ in "
+                             "length (%d!=%d)." % (len(F), len(O)))
+
+        self.N += len(F)
+
+        self._sumSE += ((F-O)**2).sum()
+        self._sumF  += F.sum()
+        self._sumF2 += (F*F).sum()
+        self._sumO  += O.sum()
+        self._sumO2 += (O*O).sum()
+
+        index = bin_index(self.edges, F)
+        Nbins = len(self._binN)
+
+        self._binF += numpy.bincount(index, weights=F, minlength=Nbins)
+        self._binO += numpy.bincount(index, weights=O, minlength=Nbins)
+        self._binN += numpy.bincount(index, minlength=Nbins)
+
+        # End update_array(self, ...)
+        return None
+
+    #-------------------------------------------------------------------------#
+
+    def merge(self, other):
+        """Combine the data summarized by another accumulator.
+
+        Both accumulators must use the same bins.
+
+        Return value:
+        None
+        """
+        if not numpy.array_equal(self.edges, other.edges):
+            raise ValueError("Cannot merge accumulators with different "
+                             "bins.")
+
+        self.N += other.N
+
+        self._sumSE += other._sumSE
+        self._sumF  += other._sumF
+        self._sumF2 += other._sumF2
+        self._sumO  += other._sumO
+        self._sumO2 += other._sumO2
+
+        self._binF += other._binF
+        self._binO += other._binO
+        self._binN += other._binN
+
+        # End merge(self, ...)
+        return None
+
+    #-------------------------------------------------------------------------#
+
+    def stats(self):
+        """Return the forecast statistics of the accumulated data.
+
+        Return value:
+        dictionary of test results indexed by test.
+        """
+        results = {}
+
+        N = numpy.float64(self.N)
+
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            # Calculate the climatology value
+            C = self._sumO / N
+
+            # Calculate the "Brier Score"
+            results['BS'] = self._sumSE / N
+
+            # Calculate the "Brier Skill Score"
+            BSC = self._sumF2/N - 2*C*self._sumF/N + C*C
+            results['BSS'] = 1 - results['BS']/BSC
+
+            # Calculate the mean forecast and event rate of each bin
+            used = self._binN > 0
+            n = self._binN[used]
+            f = self._binF[used] / n
+            o = self._binO[used] / n
+
+            # Calculate the "Reliability", "Resolution" and "Uncertainty"
+            results['REL'] = (n * (f-o)**2).sum() / N
+            results['RES'] = (n * (o-C)**2).sum() / N
+            results['UNC'] = self._sumO2/N - C*C
+
+        # End stats(self)
+        return results
+
+###############################################################################
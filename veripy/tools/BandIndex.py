@@ -0,0 +1,300 @@
+# BandIndex.py
+#
+# Copyright (c) James R. Holliday, jrholliday@gmail.com
+# See 'license.txt' for licensing and usage restrictions.
+#
+###############################################################################
+
+"""Index for bootstrap confidence band queries.
+
+This module exports only one object: the BandIndex class definition.
+"""
+
+###############################################################################
+
+from __future__ import division
+
+import numpy
+
+###############################################################################
+
+# Number of set bits in each byte value
+_popcount = numpy.array([ bin(i).count('1') for i in xrange(256) ],
+                        dtype=numpy.int64)
+
+###############################################################################
+
+class BandIndex(object):
+    """
+    This class indexes a cloud of (key, value) points, such as the
+    bootstrapped points of an ROC curve, so that the confidence
+    limits around many curve points can be found at once.  A band
+    query takes the points whose key lies within a given width of
+    the curve point, and asks for quantiles of their values.
+
+    The points are sorted by key once, so that every query window is
+    a run of consecutive positions.  The values are replaced by their
+    ranks among the distinct values, and the ranks, in key order, are
+    split bit by bit into a wavelet matrix: for each bit, from the
+    highest down, the bit is stored with the count of zero bits
+    before every byte, and the points are stably sorted by that bit
+    for the next level.  Counting the values below a given one in a
+    window, or picking the k-th lowest value in a window, then walks
+    down the bits with two counts per bit, in O(log P) for P points,
+    whatever the window size.  Whole arrays of queries are answered
+    at once.  The index takes O(P log P) time to build and under a
+    byte per point per bit of memory.
+
+    Sample usage:
+        index = BandIndex(keys, values)
+        lower, upper = index.limits(near, value, .01, .95)
+    """
+
+    #-------------------------------------------------------------------------#
+
+    def __init__(self, keys, values):
+        """Initialize BandIndex object.
+
+        Keyword arguments:
+        keys   -- array of point coordinates along the window axis.
+        values -- array of point coordinates along the quantile axis.
+        """
+        keys   = numpy.asarray(keys, dtype=float)
+        values = numpy.asarray(values, dtype=float)
+
+        order = numpy.argsort(keys, kind='mergesort')
+
+        # Keys in increasing order
+        self._keys = keys[order]
+
+        # Distinct values, and the rank of the value of the point at
+        # each key position
+        self._values, rank = numpy.unique(values[order], return_inverse=True)
+
+        self._nbits = max(len(self._values) - 1, 1).bit_length()
+
+        itype = numpy.int32 if len(keys) < 2**31 else numpy.int64
+        rank = rank.astype(itype)
+
+        # Bits, zero bits before each byte and total zero bits of
+        # each level, from the highest bit down
+        self._bits  = []
+        self._zeros = []
+        self._total = []
+
+        for level in xrange(self._nbits):
+            bit = ( (rank >> (self._nbits - 1 - level)) & 1 ).astype(bool)
+
+            packed = numpy.packbits(bit)
+            packed = numpy.append(packed, numpy.uint8(0))
+
+            ones = _popcount[packed]
+            zeros = 8*numpy.arange(len(packed)) - (numpy.cumsum(ones) - ones)
+
+            self._bits.append(packed)
+            self._zeros.append(zeros.astype(itype))
+            self._total.append(len(bit) - int(numpy.count_nonzero(bit)))
+
+            # Stable sort by this bit for the next level
+            rank = numpy.concatenate(( rank[~bit] , rank[bit] ))
+
+    #-------------------------------------------------------------------------#
+
+    def __len__(self):
+        """Return number of indexed points."""
+
+        # End __len__(self)
+        return len(self._keys)
+
+    #-------------------------------------------------------------------------#
+
+    def _rank0(self, level, pos):
+        """Count the zero bits of a level before each position.
+
+        This is an internal function and should not be called directly.
+        """
+        byte = pos >> 3
+
+        # Bits of the partial byte before the position (highest first)
+        mask = (0xFF00 >> (pos & 7)) & 0xFF
+        ones = _popcount[self._bits[level][byte] & mask]
+
+        # End _rank0(self, ...)
+        return self._zeros[level][byte] - ones + (pos & 7)
+
+    #-------------------------------------------------------------------------#
+
+    def _count(self, start, stop, rank):
+        """Count the points in each window with a value rank below rank.
+
+        This is an internal function and should not be called directly.
+        """
+        total = stop - start
+        count = numpy.zeros(len(start), dtype=numpy.int64)
+
+        for level in xrange(self._nbits):
+            bit = (rank >> (self._nbits - 1 - level)) & 1
+
+            zs = self._rank0(level, start)
+            ze = self._rank0(level, stop)
+
+            # The points with a zero bit here are below rank if its
+            # bit is one.  Follow the points sharing its bit.
+            count += numpy.where(bit == 1, ze - zs, 0)
+
+            start = numpy.where(bit == 1, self._total[level] + start - zs, zs)
+            stop  = numpy.where(bit == 1, self._total[level] + stop  - ze, ze)
+
+        # Ranks past the last distinct value are above every point
+        count = numpy.where(rank >= len(self._values), total, count)
+
+        # End _count(self, ...)
+        return count
+
+    #-------------------------------------------------------------------------#
+
+    def _select(self, start, stop, k):
+        """Find the value rank of the k-th lowest value in each window.
+
+        This is an internal function and should not be called directly.
+        k must be below the number of points in each window.
+        """
+        rank = numpy.zeros(len(start), dtype=numpy.int64)
+
+        for level in xrange(self._nbits):
+            zs = self._rank0(level, start)
+            ze = self._rank0(level, stop)
+
+            # Follow the ones if the k-th point is not among the zeros
+            one = k >= ze - zs
+
+            k = numpy.where(one, k - (ze - zs), k)
+
+            start = numpy.where(one, self._total[level] + start - zs, zs)
+            stop  = numpy.where(one, self._total[level] + stop  - ze, ze)
+
+            rank |= one.astype(numpy.int64) << (self._nbits - 1 - level)
+
+        # End _select(self, ...)
+        return rank
+
+    #-------------------------------------------------------------------------#
+
+    def _first(self, near, start, test):
+        """Return the first key positions passing a monotone test.
+
+        This is an internal function and should not be called directly.
+
+        Keyword arguments:
+        near  -- array of curve point keys.
+        start -- array of first guesses, found by binary search.
+        test  -- function of the key offsets from near, False up to
+                 some position and True from there on.
+
+        The guesses can be off by a rounding error in the offsets, and
+        are moved over whole runs of equal keys until they are exact.
+        """
+        keys = self._keys
+        P = len(keys)
+
+        pos = start.copy()
+
+        while True:
+            last = numpy.maximum(pos - 1, 0)
+            back = (pos > 0) & test(keys[last] - near)
+
+            here = numpy.minimum(pos, P - 1)
+            ahead = (pos < P) & ~back & ~test(keys[here] - near)
+
+            if not back.any() and not ahead.any():
+                break
+
+            pos[back]  = numpy.searchsorted(keys, keys[last[back]],
+                                            side='left')
+            pos[ahead] = numpy.searchsorted(keys, keys[here[ahead]],
+                                            side='right')
+
+        # End _first(self, ...)
+        return pos
+
+    #-------------------------------------------------------------------------#
+
+    def window(self, near, width):
+        """Find the points within width of each curve point.
+
+        Keyword arguments:
+        near  -- array of curve point keys.
+        width -- half width of the window.
+
+        A point is in the window when abs(key - near) <= width.  The
+        window is a run of consecutive key positions.
+
+        Return values:
+        array of first positions in each window,
+        array of positions just after each window.
+        """
+        near = numpy.asarray(near, dtype=float)
+
+        start = numpy.searchsorted(self._keys, near - width, side='left')
+        stop  = numpy.searchsorted(self._keys, near + width, side='right')
+
+        start = self._first(near, start, lambda d: d >= -width)
+        stop  = self._first(near, stop,  lambda d: d >   width)
+
+        # End window(self, ...)
+        return start, stop
+
+    #-------------------------------------------------------------------------#
+
+    def limits(self, near, value, width, level):
+        """Find the confidence limits around many curve points.
+
+        Keyword arguments:
+        near  -- array of curve point keys.
+        value -- array of curve point values.
+        width -- half width of the window along the key axis.
+        level -- confidence level of the limits.
+
+        Only points within width of the curve point along the key
+        axis are used (see window).  Those with values at or below
+        value are sorted in decreasing order, those at or above value
+        in increasing order, and the level quantile, int(level*n) for
+        n points, is taken from each list.
+
+        Return values:
+        array of lower limits (NaN where there are no points),
+        array of upper limits (NaN where there are no points).
+        """
+        value = numpy.asarray(value, dtype=float)
+
+        start, stop = self.window(near, width)
+
+        n = stop - start
+
+        # Count the points at or below value, and at or above it
+        below = numpy.searchsorted(self._values, value, side='right')
+        above = numpy.searchsorted(self._values, value, side='left')
+
+        N = self._count(start, stop, below)
+        M = n - self._count(start, stop, above)
+
+        limits = []
+
+        # Positions of the quantiles among the sorted window values
+        for count, pick in ( (N, lambda m, k: m-1-k) ,
+                             (M, lambda m, k: n-m+k) ):
+            k = (level*count).astype(int)
+            ok = k < count
+
+            rank = self._select(start, stop,
+                                numpy.where(ok, pick(count, k), 0))
+
+            # Empty windows give no rank
+            rank = numpy.minimum(rank, len(self._values) - 1)
+
+            limits.append( numpy.where(ok, self._values[rank], numpy.nan) )
+
+        # End limits(self, ...)
+        return limits[0], limits[1]
+
+###############################################################################
@@ -0,0 +1,122 @@
+# Binning.py
+#
+# Copyright (c) James R. Holliday, jrholliday@gmail.com
+# See 'license.txt' for licensing and usage restrictions.
+#
+###############################################################################
+
+"""Histogram bin construction and assignment.
+
+This module exports functions for building forecast histogram bins
+and for sorting forecasts into them.  These are the rules used by
+Forecast.histogram and everything built on top of it.
+"""
+
+###############################################################################
+
+from __future__ import division
+
+import numpy
+
+###############################################################################
+
+def bin_edges(F, O, N, unit=None):
+    """Construct N histogram bins over a set of forecasts.
+
+    Keyword arguments:
+    F    - Array of forecasts.
+    O    - Array of observations.
+    N    - Number of bins.
+    unit - Construct bins uniformly over the total range? (Default None)
+
+    The unit keyword dictates whether the N bins are constructed with
+    uniform width over the forecast range (unit=True), with uniform
+    "width" over the forecast distribution (unit=False), or "balanced"
+    such that each bin gets roughly the same number of "events"
+    (unit=None).
+
+    Return value:
+    list of bin edges.
+    """
+    bins = []
+
+    if unit is None:
+        # Find the distinct forecasts that saw an event
+        thresh = numpy.unique(F[O >= 1])
+        Nobs = len(thresh)
+
+        groups = [int(Nobs/N)+1 if i<Nobs%N
+                  else int(Nobs/N)
+                  for i in range(N)]
+
+        bins.append( F.min() )
+        indx = 0
+        for i in xrange(N-1):
+            indx += groups[i]
+            if indx+1 < Nobs:
+                bins.append(.5*(thresh[indx]+thresh[indx+1]))
+        bins.append( F.max() )
+
+    elif unit is True:
+        L = F.min()
+        U = F.max()
+
+        dx = ( U - L ) / N
+
+        for i in xrange(0 , N+1):
+            bins.append(L + i*dx)
+
+    else:
+        tmp = numpy.sort(F)
+        NN = len(tmp)-1
+
+        for i in xrange(0 , N+1):
+            bins.append(tmp[int(NN*i/N)])
+
+    # End bin_edges(...)
+    return bins
+
+#-----------------------------------------------------------------------------#
+
+def bin_index(bins, F):
+    """Find the histogram bin of each forecast.
+
+    Keyword arguments:
+    bins - List of bin edges.
+    F    - Array of forecasts.
+
+    Forecasts below the first edge are underflow, and forecasts above
+    the last edge are overflow.  Anything else belongs to the first
+    bin whose upper edge is greater than or equal to it.  Edges do not
+    have to be sorted.  The search costs O(log(bins)) per forecast.
+
+    Return value:
+    array of bin indices.  Index 0 is underflow, index i (from 1 to
+    len(bins)-1) is the bin with upper edge bins[i], index len(bins)
+    is overflow, and index len(bins)+1 marks forecasts that fall in
+    no bin at all (such as NaN).
+    """
+    edges = numpy.asarray(bins, dtype=float)
+    F = numpy.asarray(F)
+
+    Nedges = len(edges)
+
+    # The first upper edge >= f is the first running maximum >= f
+    upper = numpy.maximum.accumulate(edges[1:])
+    index = 1 + numpy.searchsorted(upper, F, side='left')
+
+    with numpy.errstate(invalid='ignore'):
+        under = F < edges[0]
+        over  = F > edges[-1]
+
+    # Anything beyond the last running maximum fits in no bin
+    index[index == Nedges] = Nedges + 1
+
+    # Check for overflow, then underflow
+    index[over]  = Nedges
+    index[under] = 0
+
+    # End bin_index(...)
+    return index
+
+###############################################################################
@@ -20,13 +20,15 @@ import scipy.special
 
 ###############################################################################
 
-def CI(p, n, sigma=1.96):
+def CI(p, n, sigma=1.96, method='wilson'):
     """Calculate confidence interval for a given probability measure.
 
     Keyword arguments:
-    p     - Probability measure.  Should/must be between 0 and 1.
-    n     - Sample size.
-    sigma - Sigma level. (Default 1.96)
+    p      - Probability measure.  Should/must be between 0 and 1.
+    n      - Sample size.
+    sigma  - Sigma level. (Default 1.96)
+    method - 'wilson', 'clopper-pearson' or 'jeffreys'.
+             (Default 'wilson')
 
     This function should be used when the sample estimate is a
     probability measure.  In this special case, it can reasonably be
@@ -34,17 +36,68 @@ def CI(p, n, sigma=1.96):
     binomial distribution can be used.  The default value of sigma
     (1.96) corresponds to a 95% confidence interval.
 
+    The default Wilson score interval is a closed-form approximation.
+    The Clopper-Pearson interval is exact: its bounds are quantiles of
+    beta distributions with p*n and n-p*n+1 (and p*n+1 and n-p*n)
+    degrees of freedom.  The Jeffreys interval takes its bounds from
+    the Beta(p*n+1/2, n-p*n+1/2) posterior.  Both are 0 (or 1) at p=0
+    (or p=1).
+
+    Both p and n can be arrays, in which case the bounds are arrays
+    with one entry per (p, n) pair.
+
     Return value:
     lower confidence level.
     upper confidence level.
     """
 
-    lower = (p + sigma**2/2/n -
-             sigma*numpy.sqrt((p*(1-p) + sigma**2/4./n)/n)) / (1 + sigma**2/n)
-    upper = (p + sigma**2/2/n +
-             sigma*numpy.sqrt((p*(1-p) + sigma**2/4./n)/n)) / (1 + sigma**2/n)
+    if method == 'wilson':
+        lower = (p + sigma**2/2/n - sigma*numpy.sqrt((p*(1-p) +
+                 sigma**2/4./n)/n)) / (1 + sigma**2/n)
+        upper = (p + sigma**2/2/n + sigma*numpy.sqrt((p*(1-p) +
+                 sigma**2/4./n)/n)) / (1 + sigma**2/n)
+
+    elif method == 'clopper-pearson':
+        lower, upper = _beta_interval(p, n, sigma, 0.0, 1.0)
+
+    elif method == 'jeffreys':
+        lower, upper = _beta_interval(p, n, sigma, 0.5, 0.5)
+
+    else:
+        raise ValueError("'%s' is not a valid interval method." % method)
 
     # End CI(...)
     return ( lower , upper )
 
+#-----------------------------------------------------------------------------#
+
+def _beta_interval(p, n, sigma, a, b):
+    """Calculate a confidence interval from beta distribution quantiles.
+
+    This is an internal function and should not be called directly.
+    The lower bound is taken from Beta(x+a, n-x+b) and the upper bound
+    from Beta(x+b, n-x+a), where x = p*n is the number of successes.
+    """
+    scalar = numpy.ndim(p) == 0 and numpy.ndim(n) == 0
+
+    p = numpy.asarray(p, dtype=float)
+    n = numpy.asarray(n, dtype=float)
+
+    # Number of successes and tail probability of each bound
+    x = p*n
+    alpha = 1 - scipy.special.erf(sigma/numpy.sqrt(2))
+
+    with numpy.errstate(invalid='ignore'):
+        lower = scipy.special.betaincinv(x + a, n - x + b, alpha/2)
+        upper = scipy.special.betaincinv(x + b, n - x + a, 1 - alpha/2)
+
+    lower = numpy.where(p <= 0, 0.0, lower)
+    upper = numpy.where(p >= 1, 1.0, upper)
+
+    if scalar:
+        lower, upper = float(lower), float(upper)
+
+    # End _beta_interval(...)
+    return lower, upper
+
 ###############################################################################
@@ -0,0 +1,189 @@
+# DataBuffer.py
+#
+# Copyright (c) James R. Holliday, jrholliday@gmail.com
+# See 'license.txt' for licensing and usage restrictions.
+#
+###############################################################################
+
+"""Columnar storage for forecast/observed data pairs.
+
+This module exports only one object: the DataBuffer class definition.
+"""
+
+###############################################################################
+
+import numpy
+
+###############################################################################
+
+class DataBuffer(object):
+    """
+    This class stores (forecast, observed) data pairs as two typed,
+    growable NumPy columns.  When a column fills up its capacity is
+    doubled, so appending N pairs one at a time costs amortized O(N).
+    The columns are exposed as zero-copy views of the filled part of
+    each buffer.
+
+    Sample usage:
+        data = DataBuffer(dtype=(float, int))
+        data.append(0.3, 1)
+        data.extend(F, O)
+        data.F, data.O
+    """
+
+    #-------------------------------------------------------------------------#
+
+    def __init__(self, dtype=(float, float), capacity=1024):
+        """Initialize DataBuffer object.
+
+        Keyword arguments:
+        dtype    -- (forecast, observed) column data types.
+                    (default (float, float))
+        capacity -- initial number of pairs to allocate. (default 1024)
+        """
+
+        # Storage for data columns ( forecast , observed )
+        self._F = numpy.empty(capacity, dtype=dtype[0])
+        self._O = numpy.empty(capacity, dtype=dtype[1])
+
+        # Number of filled entries
+        self._size = 0
+
+    #-------------------------------------------------------------------------#
+
+    def __len__(self):
+        """Return number of stored data pairs."""
+
+        # End __len__(self)
+        return self._size
+
+    #-------------------------------------------------------------------------#
+
+    def __iter__(self):
+        """Iterate over stored (forecast, observed) data pairs."""
+
+        # End __iter__(self)
+        return iter(zip(self.F.tolist(), self.O.tolist()))
+
+    #-------------------------------------------------------------------------#
+
+    def __str__(self):
+        """Return string representation of data pairs."""
+
+        # End __str__(self)
+        return str(zip(self.F.tolist(), self.O.tolist()))
+
+    #-------------------------------------------------------------------------#
+
+    def _reserve(self, size):
+        """Grow the columns to hold at least size pairs.
+
+        This is an internal function and should not be called directly.
+        """
+        capacity = len(self._F)
+
+        if size <= capacity:
+            return None
+
+        # Double the capacity, or take exactly what a bulk add needs
+        capacity = max(2*capacity, size)
+
+        F = numpy.empty(capacity, dtype=self._F.dtype)
+        O = numpy.empty(capacity, dtype=self._O.dtype)
+
+        F[:self._size] = self._F[:self._size]
+        O[:self._size] = self._O[:self._size]
+
+        self._F = F
+        self._O = O
+
+        # End _reserve(self, ...)
+        return None
+
+    #-------------------------------------------------------------------------#
+
+    def append(self, forecast, observed):
+        """Add a single forecast/observed data pair.
+
+        Return value:
+        None
+        """
+        self._reserve(self._size + 1)
+
+        self._F[self._size] = forecast
+        self._O[self._size] = observed
+        self._size += 1
+
+        # End append(self, ...)
+        return None
+
+    #-------------------------------------------------------------------------#
+
+    def extend(self, forecast, observed):
+        """Add arrays of forecast/observed data pairs.
+
+        Keyword arguments:
+        forecast -- array of forecasted values.
+        observed -- array of observed values, same length as forecast.
+
+        Return value:
+        None
+        """
+        forecast = numpy.asarray(forecast).ravel()
+        observed = numpy.asarray(observed).ravel()
+
+        N = len(forecast)
+
+        if len(observed) != N:
+            raise ValueError("Forecast and observed arrays differ in "
+                             "length (%d!=%d)." % (N, len(observed)))
+
+        self._reserve(self._size + N)
+
+        self._F[self._size:self._size+N] = forecast
+        self._O[self._size:self._size+N] = observed
+        self._size += N
+
+        # End extend(self, ...)
+        return None
+
+    #-------------------------------------------------------------------------#
+
+    def chunks(self):
+        """Iterate over (forecast, observed) arrays in chunks.
+
+        The data is in memory, so the only chunk is the whole of both
+        columns.
+        """
+        yield self.F, self.O
+
+    #-------------------------------------------------------------------------#
+
+    @property
+    def F(self):
+        """View of the stored forecast column.
+
+        The view shares memory with the buffer.  It stays valid, but
+        will not see new data, once the buffer grows.
+        """
+        return self._F[:self._size]
+
+    #-------------------------------------------------------------------------#
+
+    @property
+    def O(self):
+        """View of the stored observed column.
+
+        The view shares memory with the buffer.  It stays valid, but
+        will not see new data, once the buffer grows.
+        """
+        return self._O[:self._size]
+
+    #-------------------------------------------------------------------------#
+
+    @property
+    def nbytes(self):
+        """Number of bytes allocated for both columns."""
+        return self._F.nbytes + self._O.nbytes
+
+###############################################################################
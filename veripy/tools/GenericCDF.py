@@ -12,7 +12,9 @@ This module exports only one object: the GenericCDF class definition.
 
 ###############################################################################
 
-import random
+from __future__ import division
+
+import numpy
 
 ###############################################################################
 
@@ -24,6 +26,7 @@ class GenericCDF:
     Sample usage:
         myCDF = GenericCDF(array, Normalized=False)
         myCDF.draw()
+        myCDF.draw(1000, method='alias')
     """
 
     #-------------------------------------------------------------------------#
@@ -39,46 +42,152 @@ class GenericCDF:
         Class initialization requires an input array.  If the array is
         already normalized (sum of all values is 1.0), the second
         argument can be set to True.  Default behavior is to go ahead
-        and (re)normalize the array.  If no value is intered for the
-        random number generator seed, the current time will be used.
+        and (re)normalize the array.  Each object owns its random
+        number generator.  If no value is intered for the random
+        number generator seed, the system entropy source (or the
+        current time) will be used.
         """
-        self._cdf = []
 
         # Seed the RNG
-        random.seed(seed)
+        self._rng = numpy.random.RandomState(seed)
 
         # Calculate normalization factor
-        norm = 0.0
+        array = numpy.asarray(array, dtype=float)
+
         if Normalized:
-            norm=1.0
+            norm = 1.0
         else:
-            for value in array:
-                norm += value
+            norm = array.sum()
 
         # Integrate the array and create the CDF
-        sum = 0.0
-        for value in array:
-            sum += value
-            self._cdf.append(sum/norm)
+        self._pdf = array / norm
+        self._cdf = numpy.cumsum(array) / norm
+
+        # Storage for the alias tables (built on first use)
+        self._prob  = None
+        self._alias = None
+
+    #-------------------------------------------------------------------------#
+
+    def seed(self, seed=None):
+        """Reseed the random number generator.
+
+        Keyword arguments:
+        seed -- seed value for random number generator (default None)
+
+        Return value:
+        None
+        """
+        self._rng.seed(seed)
+
+        # End seed(self, ...)
+        return None
 
     #-------------------------------------------------------------------------#
 
-    def draw(self, N=1):
-        """Draw an array index from the inpyt distribution array."""
-        indices = []
+    def _build_alias(self):
+        """Build the probability and alias tables for the alias method.
+
+        This is an internal function and should not be called directly.
+
+        Uses Vose's construction: every cell is split between itself
+        and at most one "alias" cell so that each of the n columns
+        holds exactly 1/n of the total probability.
+
+        Cells below 1/n ("small") are topped up in order by cells
+        above it ("large"), also in order.  A large cell gives until
+        it drops below 1/n itself, and is then topped up by the next
+        large cell.  The small cell at which each large cell runs out
+        follows from comparing the running sums of the shortfalls and
+        of the surpluses, so the tables are built with a few array
+        operations instead of a loop over cells.  Construction is
+        O(n log n) and only happens once.
+        """
+        n = len(self._pdf)
+
+        scaled = self._pdf * n / self._pdf.sum()
+
+        self._prob  = numpy.ones(n)
+        self._alias = numpy.arange(n)
+
+        small = numpy.flatnonzero(scaled <  1.0)
+        large = numpy.flatnonzero(scaled >= 1.0)
+
+        # Running shortfall of the small cells and surplus of the
+        # large cells
+        short   = numpy.cumsum(1.0 - scaled[small])
+        surplus = numpy.cumsum(scaled[large] - 1.0)
+
+        # Small cell at which each large cell runs out (len(small) if
+        # it never does)
+        out = numpy.searchsorted(short, surplus, side='right')
 
-        for i in xrange(N):
-            indx = 0
+        # Large cell topping up each small cell
+        donor = numpy.searchsorted(out, numpy.arange(len(small)),
+                                   side='left')
 
-            # Draw a uniform random number (0,1] and find where it
-            # falls in our CDF.
-            rng = random.random()
-            while ( (self._cdf[indx] < rng) and (indx < len(self._cdf) - 1) ):
-                indx += 1
+        # Anything without a donor is (up to rounding) exactly full
+        ok = donor < len(large)
 
-            indices.append(indx)
+        self._prob[small[ok]]  = scaled[small[ok]]
+        self._alias[small[ok]] = large[donor[ok]]
+
+        # A large cell that runs out keeps what it has left, and is
+        # topped up by the next large cell.  The last one is full.
+        j = numpy.flatnonzero(out[:-1] < len(small))
+
+        left = 1.0 + surplus[j] - short[out[j]]
+
+        self._prob[large[j]]  = numpy.clip(left, 0.0, 1.0)
+        self._alias[large[j]] = large[j+1]
+
+        # End _build_alias(self)
+        return None
+
+    #-------------------------------------------------------------------------#
+
+    def draw(self, N=1, method='search'):
+        """Draw array indices from the input distribution array.
+
+        Keyword arguments:
+        N      -- number of indices to draw. (default 1)
+        method -- sampling method, either 'search' or 'alias'.
+                  (default 'search')
+
+        The 'search' method inverts the CDF with a binary search,
+        costing O(log n) per draw.  The 'alias' method uses Walker's
+        alias tables, costing O(1) per draw after a one-time O(n log n)
+        setup.
+
+        Return value:
+        a single index if N is 1, otherwise an array of indices.
+        """
+
+        if method == 'search':
+            # Draw uniform random numbers [0,1) and find where they
+            # fall in our CDF.
+            rng = self._rng.random_sample(N)
+
+            indices = numpy.searchsorted(self._cdf, rng, side='left')
+            numpy.minimum(indices, len(self._cdf) - 1, out=indices)
+
+        elif method == 'alias':
+            if self._alias is None:
+                self._build_alias()
+
+            # Pick a column uniformly, then either keep it or take
+            # its alias.
+            cols = self._rng.randint(len(self._prob), size=N)
+            rng  = self._rng.random_sample(N)
+
+            indices = numpy.where(rng < self._prob[cols],
+                                  cols, self._alias[cols])
+
+        else:
+            raise ValueError("Sampling method must be 'search' or "
+                             "'alias' (%s)." % method)
 
         # Return the array indices.
-        return (indices[0] if N==1 else indices)
+        return (int(indices[0]) if N==1 else indices)
 
 ###############################################################################
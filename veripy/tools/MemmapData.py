@@ -0,0 +1,239 @@
+# MemmapData.py
+#
+# Copyright (c) James R. Holliday, jrholliday@gmail.com
+# See 'license.txt' for licensing and usage restrictions.
+#
+###############################################################################
+
+"""Read-only storage for forecast/observed columns in a binary file.
+
+This module exports only one object: the MemmapData class definition.
+"""
+
+###############################################################################
+
+from __future__ import division
+
+from Binning import bin_edges
+
+import numpy
+
+###############################################################################
+
+def _flip(bits):
+    """Flip all but the sign bit of negative int64 values.
+
+    This is an internal function and should not be called directly.
+    It maps the bits of float64 values onto int64 keys with the same
+    ordering, and is its own inverse.
+    """
+
+    # End _flip(...)
+    return numpy.where(bits < 0, bits ^ numpy.int64(0x7fffffffffffffff),
+                       bits)
+
+#-----------------------------------------------------------------------------#
+
+def _key(values):
+    """Map float64 values onto ordered int64 keys.
+
+    This is an internal function and should not be called directly.
+    """
+
+    # End _key(...)
+    return _flip(numpy.asarray(values, dtype=numpy.float64)
+                 .view(numpy.int64))
+
+#-----------------------------------------------------------------------------#
+
+def _value(keys):
+    """Map ordered int64 keys back onto float64 values.
+
+    This is an internal function and should not be called directly.
+    """
+
+    # End _value(...)
+    return _flip(numpy.asarray(keys, dtype=numpy.int64)).view(numpy.float64)
+
+###############################################################################
+
+class MemmapData(object):
+    """
+    This class maps the forecast and observed columns of a binary file
+    of fixed-size records with numpy.memmap.  Nothing is read until it
+    is needed, and the columns are handed out in chunks of chunksize
+    records, so memory use does not grow with the size of the file.
+
+    Sample usage:
+        data = MemmapData('grid.bin', [('lon', 'f8'), ('lat', 'f8'),
+                                       ('prob', 'f8'), ('count', 'i8')],
+                          forecast='prob', observed='count')
+        for F, O in data.chunks():
+            ...
+    """
+
+    #-------------------------------------------------------------------------#
+
+    def __init__(self, filename, dtype, forecast=0, observed=1, offset=0,
+                 chunksize=1048576):
+        """Initialize MemmapData object.
+
+        Keyword arguments:
+        filename  -- name of the binary file.
+        dtype     -- record data type, either a numpy structured dtype
+                     or a list of column types.
+        forecast  -- name or number of the forecast column. (default 0)
+        observed  -- name or number of the observed column. (default 1)
+        offset    -- bytes to skip at the start of the file. (default 0)
+        chunksize -- number of records per chunk. (default 1048576)
+        """
+
+        if type(dtype) in (list, tuple) and \
+           not all(type(i) is tuple for i in dtype):
+            dtype = [ ('f%d' % i, t) for i,t in enumerate(dtype) ]
+
+        dtype = numpy.dtype(dtype)
+
+        if type(forecast) is int: forecast = dtype.names[forecast]
+        if type(observed) is int: observed = dtype.names[observed]
+
+        self.filename  = filename
+        self.chunksize = chunksize
+
+        # Storage for the mapped records
+        self._map = numpy.memmap(filename, dtype=dtype, mode='r',
+                                 offset=offset)
+
+        # Views of the forecast and observed columns
+        self.F = self._map[forecast]
+        self.O = self._map[observed]
+
+    #-------------------------------------------------------------------------#
+
+    def __len__(self):
+        """Return number of stored data pairs."""
+
+        # End __len__(self)
+        return len(self._map)
+
+    #-------------------------------------------------------------------------#
+
+    def __str__(self):
+        """Return string description of the mapped file."""
+
+        # End __str__(self)
+        return "<%d records in %s>" % (len(self), self.filename)
+
+    #-------------------------------------------------------------------------#
+
+    def chunks(self):
+        """Iterate over (forecast, observed) arrays of chunksize records.
+
+        Each chunk is copied out of the file into contiguous arrays.
+        """
+        for start in xrange(0, len(self), self.chunksize):
+            stop = start + self.chunksize
+
+            yield (numpy.ascontiguousarray(self.F[start:stop]),
+                   numpy.ascontiguousarray(self.O[start:stop]))
+
+    #-------------------------------------------------------------------------#
+
+    def select(self, ranks, base=1024):
+        """Find the forecasts at given ranks of the sorted forecasts.
+
+        Keyword arguments:
+        ranks -- list of ranks, counting from 0.
+        base  -- number of candidate values per rank and pass.
+                 (default 1024)
+
+        The forecasts are mapped onto ordered integer keys, and each
+        pass over the file narrows down the key of every rank by a
+        factor of base.  The result is exact after at most
+        ceil(64/log2(base)) passes, without ever sorting more than a
+        chunk.
+
+        Return value:
+        array of forecasts.
+        """
+        ranks = [ int(k) for k in ranks ]
+
+        # The key of rank k lies in (lo, hi]
+        lo = [ int(_key([-numpy.inf])[0]) - 1 for k in ranks ]
+        hi = [ int(_key([numpy.inf])[0]) for k in ranks ]
+
+        while any( hi[i] - lo[i] > 1 for i in xrange(len(ranks)) ):
+            # Spread candidate keys evenly over each interval
+            cands = []
+            for i in xrange(len(ranks)):
+                step = hi[i] - lo[i]
+                cands.append(sorted(set( lo[i] + (step*j)//base
+                                         for j in xrange(1, base+1) )))
+
+            values = _value([ c for cand in cands for c in cand ])
+
+            # Count the forecasts at or below each candidate
+            counts = numpy.zeros(len(values), dtype=numpy.int64)
+            for F,O in self.chunks():
+                counts += numpy.searchsorted(numpy.sort(F), values,
+                                             side='right')
+
+            # Keep the first candidate interval holding rank k
+            start = 0
+            for i in xrange(len(ranks)):
+                stop = start + len(cands[i])
+
+                j = numpy.searchsorted(counts[start:stop], ranks[i],
+                                       side='right')
+
+                hi[i] = cands[i][j]
+                if j > 0: lo[i] = cands[i][j-1]
+
+                start = stop
+
+        # End select(self, ...)
+        return _value(hi) + 0.0
+
+    #-------------------------------------------------------------------------#
+
+    def bin_edges(self, N, unit=None):
+        """Construct N histogram bins over the mapped forecasts.
+
+        Keyword arguments:
+        N    -- number of bins.
+        unit -- construct bins uniformly over the total range?
+                (default None)
+
+        The bins are exactly those of tools.Binning.bin_edges, found
+        with passes over the file.
+
+        Return value:
+        list of bin edges.
+        """
+
+        if unit is False:
+            NN = len(self) - 1
+
+            # End bin_edges(self, ...)
+            return self.select([ int(NN*i/N)
+                                 for i in xrange(0 , N+1) ]).tolist()
+
+        # Only the range (and the forecasts that saw an event) matter
+        L, U = numpy.inf, -numpy.inf
+        events = []
+
+        for F,O in self.chunks():
+            L = min(L, F.min())
+            U = max(U, F.max())
+
+            if unit is None:
+                events.append( numpy.unique(F[O >= 1]) )
+
+        F = numpy.concatenate(events + [ [L, U] ])
+        O = numpy.zeros(len(F), dtype=int)
+        O[:-2] = 1
+
+        # End bin_edges(self, ...)
+        return bin_edges(F, O, N, unit)
+
+###############################################################################
@@ -0,0 +1,306 @@
+# Replicates.py
+#
+# Copyright (c) James R. Holliday, jrholliday@gmail.com
+# See 'license.txt' for licensing and usage restrictions.
+#
+###############################################################################
+
+"""Storage for bootstrap replicates of observed event counts.
+
+This module exports the Replicates and LazyReplicates class
+definitions and the draw_replicates function that fills them (with
+share_distribution and draw_shared for worker pools).  A bootstrap
+replicate assigns a number of events to each forecast cell.  Almost
+every count is zero, so only the non-zero cells are kept.
+"""
+
+###############################################################################
+
+from __future__ import division
+
+from GenericCDF import GenericCDF
+
+import numpy
+
+###############################################################################
+
+def _draw_row(method, NN, pvals, seed, myCDF=None):
+    """Draw the event counts of a single replicate.
+
+    This is an internal function and should not be called directly.
+    """
+    if method == 'multinomial':
+        rng = numpy.random.RandomState(seed)
+        row = rng.multinomial(NN, pvals)
+
+    else:
+        sampler = {'cdf' : 'search', 'alias' : 'alias'}[method]
+
+        myCDF.seed(seed)
+        indx = numpy.atleast_1d(myCDF.draw(NN, method=sampler))
+        row = numpy.bincount(indx, minlength=len(pvals))
+
+    # End _draw_row(...)
+    return row
+
+#-----------------------------------------------------------------------------#
+
+def draw_replicates(args):
+    """Draw a block of bootstrap replicates.
+
+    Keyword arguments:
+    args - Tuple of sampling method ('multinomial', 'cdf' or 'alias'),
+           number of events per replicate, array of cells that can
+           receive events, normalized distribution over those cells
+           and one random number generator seed per replicate.
+
+    Each replicate draws from its own random number generator, so
+    the block contents do not depend on how replicates are divided
+    among blocks.  The single tuple argument lets this function be
+    sent to worker processes with map().
+
+    Return value:
+    array of non-zero cells per replicate,
+    array of cell indices,
+    array of event counts.
+    """
+    method, NN, support, pvals, seeds = args
+
+    if method != 'multinomial':
+        myCDF = GenericCDF(pvals, Normalized=True)
+    else:
+        myCDF = None
+
+    lengths = numpy.zeros(len(seeds), dtype=int)
+    indices = []
+    counts  = []
+
+    for i in xrange(len(seeds)):
+        row = _draw_row(method, NN, pvals, seeds[i], myCDF)
+
+        nonzero = numpy.flatnonzero(row)
+
+        lengths[i] = len(nonzero)
+        indices.append( support[nonzero] )
+        counts.append( row[nonzero] )
+
+    # End draw_replicates(...)
+    return lengths, numpy.concatenate(indices), numpy.concatenate(counts)
+
+#-----------------------------------------------------------------------------#
+
+# Sampling distribution of this worker process (see share_distribution)
+_shared = None
+
+def share_distribution(method, NN, support, pvals):
+    """Keep the sampling distribution for later draw_shared calls.
+
+    Keyword arguments:
+    method  - Sampling method ('multinomial', 'cdf' or 'alias').
+    NN      - Number of events per replicate.
+    support - Array of cells that can receive events.
+    pvals   - Normalized distribution over those cells.
+
+    This is meant as the initializer of a multiprocessing.Pool, so
+    that the distribution reaches each worker once, when it starts,
+    and the tasks only carry seeds.
+
+    Return value:
+    None
+    """
+    global _shared
+
+    _shared = (method, NN, support, pvals)
+
+    # End share_distribution(...)
+    return None
+
+#-----------------------------------------------------------------------------#
+
+def draw_shared(seeds):
+    """Draw a block of bootstrap replicates from the shared distribution.
+
+    Keyword arguments:
+    seeds - One random number generator seed per replicate.
+
+    Same as draw_replicates, with the distribution given earlier to
+    share_distribution in this process.
+
+    Return value:
+    array of non-zero cells per replicate,
+    array of cell indices,
+    array of event counts.
+    """
+
+    # End draw_shared(...)
+    return draw_replicates(_shared + (seeds,))
+
+###############################################################################
+
+class Replicates(object):
+    """
+    This class stores bootstrap replicates in compressed sparse row
+    (CSR) form: for each replicate, the indices of the cells that
+    received events and their event counts.  Memory grows with the
+    number of events, not the number of cells, and is at most
+    N * NN entries for N replicates of NN events each.
+
+    Sample usage:
+        boot = Replicates(Ncells, [draw_replicates(args)])
+        indices, counts = boot.row(0)
+        boot.nbytes
+    """
+
+    #-------------------------------------------------------------------------#
+
+    def __init__(self, ncells, blocks=()):
+        """Initialize Replicates object.
+
+        Keyword arguments:
+        ncells -- number of forecast cells.
+        blocks -- list of blocks returned by draw_replicates. (default ())
+        """
+        self.ncells = ncells
+
+        blocks = list(blocks)
+
+        lengths = [ block[0] for block in blocks ]
+        indices = [ block[1] for block in blocks ]
+        counts  = [ block[2] for block in blocks ]
+
+        lengths = numpy.concatenate(lengths) if blocks else numpy.zeros(0)
+
+        # Storage for row pointers, cell indices and event counts
+        self._indptr = numpy.zeros(len(lengths)+1, dtype=numpy.int64)
+        numpy.cumsum(lengths, out=self._indptr[1:])
+
+        itype = numpy.min_scalar_type(max(ncells-1, 0))
+
+        if blocks:
+            self._indices = numpy.concatenate(indices).astype(itype)
+            counts = numpy.concatenate(counts)
+            ctype = numpy.min_scalar_type(counts.max() if len(counts) else 0)
+            self._counts = counts.astype(ctype)
+        else:
+            self._indices = numpy.zeros(0, dtype=itype)
+            self._counts  = numpy.zeros(0, dtype=numpy.uint8)
+
+    #-------------------------------------------------------------------------#
+
+    def __len__(self):
+        """Return number of stored replicates."""
+
+        # End __len__(self)
+        return len(self._indptr) - 1
+
+    #-------------------------------------------------------------------------#
+
+    def __iter__(self):
+        """Iterate over (indices, counts) of each replicate."""
+        for i in xrange(len(self)):
+            yield self.row(i)
+
+    #-------------------------------------------------------------------------#
+
+    def row(self, i):
+        """Return the non-zero cells of replicate i.
+
+        Return values:
+        array of cell indices,
+        array of event counts.
+        """
+        start = self._indptr[i]
+        stop  = self._indptr[i+1]
+
+        # End row(self, ...)
+        return self._indices[start:stop], self._counts[start:stop]
+
+    #-------------------------------------------------------------------------#
+
+    def toarray(self):
+        """Return the replicates as a dense (replicates x cells) array."""
+        dense = numpy.zeros( (len(self) , self.ncells) , dtype=int )
+
+        for i in xrange(len(self)):
+            indices, counts = self.row(i)
+            dense[i][indices] = counts
+
+        # End toarray(self)
+        return dense
+
+    #-------------------------------------------------------------------------#
+
+    @property
+    def nbytes(self):
+        """Number of bytes used to store the replicates."""
+        return (self._indptr.nbytes + self._indices.nbytes +
+                self._counts.nbytes)
+
+###############################################################################
+
+class LazyReplicates(Replicates):
+    """
+    This class stands in for a Replicates object without storing any
+    replicates.  Only the sampling distribution and one seed per
+    replicate are kept, and each replicate is drawn again whenever it
+    is asked for.  Memory is fixed at O(N + cells) for N replicates,
+    at the cost of redrawing on every pass.
+
+    Sample usage:
+        boot = LazyReplicates(Ncells, (method, NN, support, pvals, seeds))
+        indices, counts = boot.row(0)
+    """
+
+    #-------------------------------------------------------------------------#
+
+    def __init__(self, ncells, args):
+        """Initialize LazyReplicates object.
+
+        Keyword arguments:
+        ncells -- number of forecast cells.
+        args   -- tuple of arguments as passed to draw_replicates.
+        """
+        self.ncells = ncells
+
+        self._method, self._NN, self._support, self._pvals, self._seeds = args
+
+        # The sampler is built once and reseeded for each replicate
+        if self._method != 'multinomial':
+            self._cdf = GenericCDF(self._pvals, Normalized=True)
+        else:
+            self._cdf = None
+
+    #-------------------------------------------------------------------------#
+
+    def __len__(self):
+        """Return number of replicates."""
+
+        # End __len__(self)
+        return len(self._seeds)
+
+    #-------------------------------------------------------------------------#
+
+    def row(self, i):
+        """Draw the non-zero cells of replicate i.
+
+        Return values:
+        array of cell indices,
+        array of event counts.
+        """
+        row = _draw_row(self._method, self._NN, self._pvals,
+                        self._seeds[i], self._cdf)
+
+        nonzero = numpy.flatnonzero(row)
+
+        # End row(self, ...)
+        return self._support[nonzero], row[nonzero]
+
+    #-------------------------------------------------------------------------#
+
+    @property
+    def nbytes(self):
+        """Number of bytes used to describe the replicates."""
+        return (self._support.nbytes + self._pvals.nbytes +
+                self._seeds.nbytes)
+
+###############################################################################
@@ -0,0 +1,224 @@
+# TextLoader.py
+#
+# Copyright (c) James R. Holliday, jrholliday@gmail.com
+# See 'license.txt' for licensing and usage restrictions.
+#
+###############################################################################
+
+"""Bulk loading of whitespace or comma delimited text tables.
+
+This module exports the iter_table and read_table functions, which
+read a text table in large chunks straight into NumPy arrays.  The
+arrays can be fed to Probabilistic.add_data_array (or from_arrays)
+and its Continuous counterparts.
+"""
+
+###############################################################################
+
+from __future__ import division
+
+import itertools
+import re
+import warnings
+
+import numpy
+
+###############################################################################
+
+def _sanitize(name):
+    """Turn a column header into a Python name.
+
+    This is an internal function and should not be called directly.
+    Units in parentheses are dropped, so 'obs(mm)' becomes 'obs', and
+    any other character that cannot appear in a name becomes '_'.
+    """
+    name = re.sub(r'\(.*?\)', '', name)
+    name = re.sub(r'\W', '_', name)
+
+    if name[:1].isdigit():
+        name = '_' + name
+
+    # End _sanitize(...)
+    return name
+
+#-----------------------------------------------------------------------------#
+
+def _parse(lines, ncols, delimiter):
+    """Parse a chunk of lines into a (rows x ncols) array.
+
+    This is an internal function and should not be called directly.
+
+    Lines with the wrong number of fields (blank lines among them)
+    are dropped, and the rest are converted at once with
+    numpy.fromstring.  Only if that fails, because some field is not
+    a number, are the lines converted one at a time.  Lines that
+    cannot be converted (comment lines among them) are dropped.
+
+    Return value:
+    array of parsed rows.
+    """
+    fields = [ len(line.split(delimiter)) for line in lines ]
+
+    if any( n != ncols for n in fields ):
+        lines = [ line for line,n in zip(lines,fields) if n == ncols ]
+
+    text = ''.join(lines)
+    if delimiter is not None:
+        text = text.replace(delimiter, ' ')
+
+    # Stop numpy from warning about text it cannot read
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        values = numpy.fromstring(text, sep=' ')
+
+    if len(values) == len(lines)*ncols:
+        return values.reshape(len(lines), ncols)
+
+    rows = []
+    for line in lines:
+        try:
+            rows.append( [ float(x) for x in line.split(delimiter) ] )
+        except ValueError:
+            pass
+
+    # End _parse(...)
+    return numpy.array(rows, dtype=float).reshape(len(rows), ncols)
+
+#-----------------------------------------------------------------------------#
+
+def iter_table(filename, columns, delimiter=None, missing=None,
+               comments='#', chunksize=65536):
+    """Read selected columns of a text table, one chunk at a time.
+
+    Keyword arguments:
+    filename  - Name of the text file (or an open file object).
+    columns   - List of columns to return.  Each column is a column
+                number, a column name, or an expression of column
+                names.
+    delimiter - Field delimiter, such as ','. (Default None, any
+                whitespace)
+    missing   - Value marking missing data. (Default None)
+    comments  - Characters starting a comment line, or None.
+                (Default '#')
+    chunksize - Number of lines per chunk. (Default 65536)
+
+    If the first line of the table is not all numbers, it is taken to
+    be a header of column names.  Names are made usable in Python:
+    units in parentheses are dropped and other odd characters become
+    '_', so 'obs(mm)' becomes 'obs'.  Columns can always be named
+    c0, c1, ... by position as well.  Expressions are evaluated with
+    NumPy over whole chunks, so derived columns such as
+    'p24_cat1 + p24_cat2' or 'obs > 0' cost no more than plain ones.
+    The numpy module is available to expressions.
+
+    Blank lines, comment lines, lines with the wrong number of fields
+    and lines that are not all numbers are skipped.  If missing is
+    set, rows where any column used by the requested columns holds
+    that value are skipped as well.
+
+    Return value:
+    iterator over tuples of arrays, one array per requested column.
+    """
+    if isinstance(filename, basestring):
+        file = open(filename)
+    else:
+        file = filename
+
+    try:
+        # Find the first line of the table
+        for first in file:
+            if first.strip() and not \
+               (comments and first.lstrip().startswith(comments)):
+                break
+        else:
+            return
+
+        # Check it for a header
+        fields = first.split(delimiter)
+        ncols = len(fields)
+
+        names = {}
+        for i in xrange(ncols):
+            names['c%d' % i] = i
+
+        try:
+            [ float(x) for x in fields ]
+            lines = itertools.chain([first], file)
+        except ValueError:
+            lines = iter(file)
+            for i,name in enumerate(fields):
+                names[_sanitize(name.strip())] = i
+
+        # Compile the columns, noting the table columns each one uses
+        specs = []
+        used = set()
+
+        for column in columns:
+            if type(column) is int:
+                specs.append(column)
+                used.add(column)
+
+            else:
+                code = compile(column, column, 'eval')
+                specs.append(code)
+                used.update( names[name] for name in code.co_names
+                             if name in names )
+
+        used = sorted(used)
+
+        while True:
+            chunk = list(itertools.islice(lines, chunksize))
+            if not chunk:
+                break
+
+            table = _parse(chunk, ncols, delimiter)
+
+            # Skip rows with missing values in one go
+            if missing is not None:
+                table = table[ ~(table[:,used] == missing).any(axis=1) ]
+
+            namespace = dict( (name, table[:,i])
+                              for name,i in names.iteritems() )
+
+            result = []
+            for spec in specs:
+                if type(spec) is int:
+                    result.append( table[:,spec] )
+                else:
+                    result.append( eval(spec, {'__builtins__' : {},
+                                               'numpy' : numpy},
+                                        namespace) )
+
+            yield tuple(result)
+
+    finally:
+        if file is not filename:
+            file.close()
+
+#-----------------------------------------------------------------------------#
+
+def read_table(filename, columns, delimiter=None, missing=None,
+               comments='#', chunksize=65536):
+    """Read selected columns of a text table.
+
+    Keyword arguments are as for iter_table, which does the reading.
+
+    Sample usage:
+        F, O = read_table('POP_3cat_2003.txt',
+                          ['p24_cat1 + p24_cat2', 'obs > 0'],
+                          missing=-999)
+        forecast = Probabilistic.from_arrays(F, O)
+
+    Return value:
+    tuple of arrays, one array per requested column.
+    """
+    chunks = list(iter_table(filename, columns, delimiter, missing,
+                             comments, chunksize))
+
+    if not chunks:
+        return tuple( numpy.zeros(0) for column in columns )
+
+    # End read_table(...)
+    return tuple( numpy.concatenate(arrays) for arrays in zip(*chunks) )
+
+###############################################################################
@@ -5,21 +5,101 @@
 #
 ###############################################################################
 
-"""Helper tools for the VeriPy package."""
+"""Helper tools for the VeriPy package.
+
+The plotting routines of the makeplots module need matplotlib, which
+is slow to import.  They are only loaded the first time one of them
+(or makeplots itself) is looked up, so that scripts that never plot
+never import matplotlib.
+"""
+
+###############################################################################
+
+import importlib
+import sys
+import types
+
+from GenericCDF import GenericCDF
+from DataBuffer import DataBuffer
+from Binning import bin_edges, bin_index
+from Replicates import Replicates, LazyReplicates, draw_replicates
+from Replicates import share_distribution, draw_shared
+from Accumulators import ContinuousAccumulator, BrierAccumulator
+from MemmapData import MemmapData
+from TextLoader import iter_table, read_table
+from ConfidenceIntervals import CI
+from BandIndex import BandIndex
+
+__all__ = ['GenericCDF',
+           'DataBuffer',
+           'bin_edges',
+           'bin_index',
+           'Replicates',
+           'LazyReplicates',
+           'draw_replicates',
+           'share_distribution',
+           'draw_shared',
+           'ContinuousAccumulator',
+           'BrierAccumulator',
+           'MemmapData',
+           'iter_table',
+           'read_table',
+           'CI',
+           'BandIndex']
+
+# Package holding the lazily loaded modules
+_source = __name__
+
+# Names provided by each lazily loaded module
+_lazy = {'makeplots' : ('plot_error',
+                        'plot_roc',
+                        'plot_area',
+                        'plot_reliability',
+                        'plot_scatter')}
 
 ###############################################################################
 
-__all__ = []
+class _LazyModule(types.ModuleType):
+    """
+    This class stands in for the tools package in sys.modules.  Python
+    2 modules cannot define __getattr__, so the package is replaced by
+    an instance of this module subclass, which imports a lazy module
+    the first time one of its names is not found.  The package gives
+    the lazy modules and their names in _lazy, and the package they
+    are imported from in _source, so that veripy itself can offer the
+    same names.
+    """
+
+    #-------------------------------------------------------------------------#
+
+    def __getattr__(self, name):
+        """Import the lazy module providing name, and return name."""
+
+        for module, names in self._lazy.iteritems():
+            if name == module or name in names:
+                break
+        else:
+            raise AttributeError("'module' object has no attribute '%s'"
+                                 % name)
+
+        loaded = importlib.import_module(self._source + '.' + module)
+
+        # Keep the names, so the import is only done once
+        setattr(self, module, loaded)
+        for item in self._lazy[module]:
+            setattr(self, item, getattr(loaded, item))
+
+        # End __getattr__(self, ...)
+        return getattr(self, name)
+
+#-----------------------------------------------------------------------------#
 
-for subpackage in ['makeplots',
-                   'GenericCDF',
-                   'ConfidenceIntervals']:
+_module = _LazyModule(__name__, __doc__)
+_module.__dict__.update(sys.modules[__name__].__dict__)
 
-    try:
-        exec 'from ' + subpackage + ' import *'
-        __all__.append( subpackage )
+# Keep the original module alive, since its functions use its globals
+_module._original = sys.modules[__name__]
 
-    except ImportError:
-        pass
+sys.modules[__name__] = _module
 
 ###############################################################################